@@ -14,7 +14,8 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    pass
+    # Счётчик ведут сигналы комментариев и recount_comments.
+    readonly_fields = ('comment_count',)
 
 
 @admin.register(Comment)
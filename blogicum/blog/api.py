@@ -0,0 +1,187 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views import generic
+
+from .models import Post
+from .paginators import CursorPaginator, InvalidCursor
+from .registry import get_categories
+from .views import filter_published_posts
+
+# Поле ответа -> (поля модели для .only(), связи для select_related,
+# функция сериализации).
+POST_FIELDS = {
+    'id': (('id',), (), lambda post: post.pk),
+    'title': (('title',), (), lambda post: post.title),
+    'text': (('text',), (), lambda post: post.text),
+    'excerpt': (('excerpt',), (), lambda post: post.excerpt),
+    'pub_date': (('pub_date',), (), lambda post: post.pub_date),
+    'author': (
+        ('author__username',), ('author',),
+        lambda post: post.author.username
+    ),
+    'category': (
+        ('category__slug',), ('category',),
+        lambda post: post.category and post.category.slug
+    ),
+    'location': (
+        ('location__name', 'location__is_published'), ('location',),
+        lambda post: (post.location.name
+                      if post.location and post.location.is_published
+                      else None)
+    ),
+    'image': (
+        ('image',), (), lambda post: post.image.url if post.image else None
+    ),
+    'comment_count': (
+        ('comment_count',), (), lambda post: post.comment_count
+    ),
+}
+DEFAULT_POST_FIELDS = (
+    'id', 'title', 'excerpt', 'pub_date', 'author', 'category', 'location',
+    'image', 'comment_count'
+)
+
+
+class ApiView(generic.View):
+    http_method_names = ['get', 'head', 'options']
+
+    def json_response(self, data):
+        content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+        etag = quote_etag(hashlib.md5(content.encode()).hexdigest())
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content, content_type='application/json; charset=utf-8'
+            )
+        response['ETag'] = etag
+        return response
+
+    def paginate(self, queryset, per_page, **kwargs):
+        paginator = CursorPaginator(
+            queryset, self.get_limit(per_page), **kwargs
+        )
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор пагинации.')
+
+    def get_limit(self, default):
+        try:
+            limit = int(self.request.GET['limit'])
+        except (KeyError, ValueError):
+            return default
+        return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+class PostFieldsMixin:
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return DEFAULT_POST_FIELDS
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = set(fields) - POST_FIELDS.keys()
+        if unknown:
+            return None
+        return fields
+
+    def project(self, queryset, fields):
+        only, related = {'id', 'pub_date'}, set()
+        for name in fields:
+            columns, relations, _ = POST_FIELDS[name]
+            only.update(columns)
+            related.update(relations)
+        return queryset.select_related(*related).only(*only)
+
+    def serialize(self, post, fields):
+        return {name: POST_FIELDS[name][2](post) for name in fields}
+
+    def bad_fields_response(self):
+        return JsonResponse(
+            {'error': 'Неизвестное поле.', 'fields': sorted(POST_FIELDS)},
+            status=400
+        )
+
+
+class PostListApiView(PostFieldsMixin, ApiView):
+    def get(self, request):
+        fields = self.get_fields()
+        if fields is None:
+            return self.bad_fields_response()
+        posts = filter_published_posts()
+        if request.GET.get('category'):
+            posts = posts.filter(category__slug=request.GET['category'])
+        if request.GET.get('author'):
+            posts = posts.filter(author__username=request.GET['author'])
+        page = self.paginate(
+            self.project(posts, fields), settings.POSTS_PER_PAGE
+        )
+        return self.json_response({
+            'results': [self.serialize(post, fields) for post in page],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+
+
+class PostDetailApiView(PostFieldsMixin, ApiView):
+    def get(self, request, post_id):
+        fields = self.get_fields()
+        if fields is None:
+            return self.bad_fields_response()
+        post = get_object_or_404(
+            self.project(Post.objects.visible_to(request.user), fields),
+            pk=post_id
+        )
+        return self.json_response(self.serialize(post, fields))
+
+
+class CommentListApiView(ApiView):
+    def get(self, request, post_id):
+        post = get_object_or_404(
+            Post.objects.visible_to(request.user).only('id'), pk=post_id
+        )
+        comments = post.comments.select_related('author').only(
+            'id', 'text', 'created_at', 'author__username'
+        )
+        page = self.paginate(
+            comments, settings.COMMENTS_PER_PAGE,
+            date_field='created_at', descending=False
+        )
+        return self.json_response({
+            'results': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at,
+                }
+                for comment in page
+            ],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+
+
+class CategoryListApiView(ApiView):
+    def get(self, request):
+        categories = sorted(
+            (category for category in get_categories()
+             if category.is_published),
+            key=lambda category: category.title
+        )
+        return self.json_response({'results': [
+            {
+                'slug': category.slug,
+                'title': category.title,
+                'description': category.description,
+            }
+            for category in categories
+        ]})
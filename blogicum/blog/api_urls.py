@@ -0,0 +1,27 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path(
+        'posts/',
+        api.PostListApiView.as_view(),
+        name='posts'
+    ),
+    path(
+        'posts/<int:post_id>/',
+        api.PostDetailApiView.as_view(),
+        name='post_detail'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='post_comments'
+    ),
+    path(
+        'categories/',
+        api.CategoryListApiView.as_view(),
+        name='categories'
+    ),
+]
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.PUBLICATION_SCHEDULER_THREAD:
+            from .scheduler import PublicationScheduler
+            PublicationScheduler().start()
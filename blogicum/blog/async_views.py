@@ -0,0 +1,224 @@
+"""Асинхронные варианты публичных страниц для работы под ASGI.
+
+ORM в Django 3.2 синхронный, а синхронные представления под ASGI
+выполняются через sync_to_async(thread_sensitive=True), то есть
+по очереди в одном общем потоке. Здесь каждое чтение идёт в пуле
+потоков со своим соединением с базой, независимые чтения страницы
+выполняются одновременно, а цикл событий не блокируется.
+
+Маршруты используют эти представления, если включён ASYNC_VIEWS.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import EmptyPage, InvalidPage
+from django.db import close_old_connections
+from django.http import Http404
+
+from . import views
+from .models import Post
+from .paginators import CachedCountPaginator
+from .registry import get_published_category_or_404
+
+
+async def run_sync(function, *args, **kwargs):
+    """Выполняет синхронную функцию в пуле потоков."""
+    def call():
+        try:
+            return function(*args, **kwargs)
+        finally:
+            # То же, что делает request_finished в потоке запроса.
+            close_old_connections()
+
+    return await sync_to_async(call, thread_sensitive=False)()
+
+
+async def gather_reads(*reads):
+    """Выполняет независимые чтения одновременно."""
+    return await asyncio.gather(*(run_sync(read) for read in reads))
+
+
+async def get_page_concurrently(paginator, number):
+    """Считает объекты и выбирает страницу number одновременно.
+
+    Номер проверяется после чтения; неверный вызывает InvalidPage.
+    """
+    if paginator.orphans:
+        return await run_sync(paginator.page, number)
+    if number < 1:
+        raise EmptyPage('Номер страницы меньше 1.')
+    bottom = (number - 1) * paginator.per_page
+    _, object_list = await gather_reads(
+        lambda: paginator.count,
+        lambda: list(
+            paginator.object_list[bottom:bottom + paginator.per_page]
+        ),
+    )
+    number = paginator.validate_number(number)
+    return paginator._get_page(object_list, number, paginator)
+
+
+class AsyncViewMixin:
+    """Асинхронный dispatch для представлений из views.
+
+    Сначала в одном потоке проверяются условный GET и кэш страниц:
+    ответ 304 и страница из кэша по-прежнему обходятся без запросов
+    страницы. Затем load() одновременно читает данные, а синхронные
+    методы представления берут их готовыми при отрисовке.
+    """
+
+    http_method_names = ['get', 'head']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Так Django вызывает представление в цикле событий.
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        response = await run_sync(self.get_early_response)
+        if response is None:
+            await self.load()
+            response = await run_sync(self.build_response)
+        return response
+
+    async def load(self):
+        """Читает данные страницы; переопределяется наследниками."""
+
+    def uses_page_cache(self):
+        return (isinstance(self, views.AnonymousPageCacheMixin)
+                and self.use_page_cache())
+
+    def get_early_response(self):
+        """Ответ без построения страницы: 304 или страница из кэша."""
+        # Пользователь загружается здесь: в цикле событий база недоступна.
+        self.request.user.is_authenticated
+        conditional = isinstance(self, views.ConditionalGetMixin)
+        response = None
+        if conditional:
+            response = self.get_not_modified_response()
+        if response is None and self.uses_page_cache():
+            response = self.get_cached_page()
+        if response is not None and conditional:
+            self.set_validators(response)
+        return response
+
+    def build_response(self):
+        response = self.get(self.request, *self.args, **self.kwargs)
+        if self.uses_page_cache():
+            self.cache_page(response)
+        if hasattr(response, 'render'):
+            # Шаблоны тоже читают из базы, поэтому отрисовка идёт здесь,
+            # а не в общем потоке обработчика запросов.
+            response.render()
+        if (isinstance(self, views.ConditionalGetMixin)
+                and response.status_code == 200):
+            self.set_validators(response)
+        return response
+
+
+class AsyncPostListMixin(AsyncViewMixin):
+    """Список публикаций: число публикаций и страница читаются вместе."""
+
+    async def load(self):
+        queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        if self.use_cursor_pagination():
+            self.paginated = await run_sync(
+                super().paginate_queryset, queryset, page_size
+            )
+            return
+        paginator = self.get_paginator(
+            queryset, page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty()
+        )
+        number = (self.kwargs.get(self.page_kwarg)
+                  or self.request.GET.get(self.page_kwarg) or 1)
+        try:
+            page = await get_page_concurrently(paginator, int(number))
+        except ValueError:
+            # 'last' и нечисловые номера разбирает ListView.
+            self.paginated = await run_sync(
+                super().paginate_queryset, queryset, page_size
+            )
+            return
+        except InvalidPage:
+            raise Http404('Неверный номер страницы.')
+        self.paginated = (
+            paginator, page, page.object_list, page.has_other_pages()
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.paginated
+
+
+class PostListView(AsyncPostListMixin, views.PostListView):
+    pass
+
+
+class CategoryPostListView(AsyncPostListMixin, views.CategoryPostListView):
+    async def load(self):
+        category_loaded = run_sync(
+            get_published_category_or_404, self.kwargs['category_slug']
+        )
+        self.category, _ = await asyncio.gather(
+            category_loaded, super().load()
+        )
+
+    def get_queryset(self):
+        # Публикации выбираются по slug, не дожидаясь категории.
+        return views.get_post_list(views.filter_published_posts().filter(
+            category__slug=self.kwargs['category_slug']
+        ))
+
+
+class PostDetailView(AsyncViewMixin, views.PostDetailView):
+    async def load(self):
+        post_id = self.kwargs['post_id']
+        self.object, self.comments = await gather_reads(
+            super().get_object,
+            lambda: views.get_comments_page(
+                Post(pk=post_id),
+                self.request.GET.get('comments_cursor')
+            ),
+        )
+
+    def get_object(self, queryset=None):
+        return self.object
+
+    def get_comments_page(self):
+        return self.comments
+
+
+class ProfileDetailView(AsyncViewMixin, views.ProfileDetailView):
+    async def load(self):
+        username = self.kwargs['username']
+        posts = views.get_post_list(Post.objects.visible_to(
+            self.request.user
+        ).filter(author__username=username))
+        paginator = CachedCountPaginator(posts, settings.POSTS_PER_PAGE)
+        try:
+            number = int(self.request.GET.get('page') or 1)
+        except ValueError:
+            number = 1
+        profile_loaded = asyncio.ensure_future(run_sync(super().get_object))
+        try:
+            self.object, self.posts_page = await asyncio.gather(
+                profile_loaded, get_page_concurrently(paginator, number)
+            )
+        except EmptyPage:
+            # Как get_paginated_page: за пределами — последняя страница.
+            self.object = await profile_loaded
+            self.posts_page = await run_sync(
+                paginator.page, paginator.num_pages
+            )
+
+    def get_object(self, queryset=None):
+        return self.object
+
+    def get_posts_page(self):
+        return self.posts_page
@@ -0,0 +1,36 @@
+"""Кэш пользователя, которого AuthenticationMiddleware кладёт в
+request.user.
+
+Вместе с сессиями cached_db это убирает из каждого запроса
+авторизованного пользователя чтение django_session и auth_user.
+Запись в кэше удаляют сигналы сохранения и удаления пользователя,
+в том числе при смене пароля: проверка хеша сессии в
+django.contrib.auth.get_user видит новый пароль сразу.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def get_user_cache():
+    return caches[settings.USER_CACHE]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    get_user_cache().delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
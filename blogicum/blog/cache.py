@@ -0,0 +1,274 @@
+import hashlib
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Post
+from .routers import reads_from_replica
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+GLOBAL_VERSION_KEY = 'post_card:version'
+CONTENT_GENERATION_KEY = 'blog:content_generation'
+GENERATION_CHANGED_KEY = 'blog:content_generation:changed_at'
+
+
+def get_post_card_cache():
+    return caches[settings.POST_CARD_CACHE]
+
+
+def post_version_key(pk):
+    return f'post_card:version:{pk}'
+
+
+def new_version():
+    # Случайная версия, а не счётчик: после вытеснения ключа версии
+    # из кэша старые карточки не могут случайно совпасть с новой.
+    return uuid4().hex[:12]
+
+
+def bump_post_card_versions(*post_ids):
+    get_post_card_cache().set_many(
+        {post_version_key(pk): new_version() for pk in post_ids}, None
+    )
+
+
+def bump_global_card_version():
+    get_post_card_cache().set(GLOBAL_VERSION_KEY, new_version(), None)
+
+
+def get_card_versions(post_ids):
+    cache = get_post_card_cache()
+    keys = [GLOBAL_VERSION_KEY] + [post_version_key(pk) for pk in post_ids]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def get_post_fragment_keys(prefix, post_ids):
+    versions = get_card_versions(post_ids)
+    global_version = versions[GLOBAL_VERSION_KEY]
+    return [
+        f'{prefix}:{pk}:{global_version}:{versions[post_version_key(pk)]}'
+        for pk in post_ids
+    ]
+
+
+def get_post_fragments(prefix, posts, render):
+    """Возвращает кэшированные фрагменты публикаций.
+
+    render получает список публикаций, которых нет в кэше, и возвращает
+    их фрагменты в том же порядке. Версии ключей общие с карточками.
+    """
+    posts = list(posts)
+    cache = get_post_card_cache()
+    keys = get_post_fragment_keys(prefix, [post.pk for post in posts])
+    cached = cache.get_many(keys)
+    missing = [
+        (post, key) for post, key in zip(posts, keys) if key not in cached
+    ]
+    if missing:
+        rendered = dict(zip(
+            (key for _, key in missing),
+            render([post for post, _ in missing])
+        ))
+        cache.set_many(
+            rendered, limit_for_replica_lag(settings.POST_CARD_CACHE_TIMEOUT)
+        )
+        cached.update(rendered)
+    return [cached[key] for key in keys]
+
+
+def render_post_cards(posts):
+    """Возвращает HTML карточек публикаций, по возможности из кэша."""
+    return get_post_fragments('post_card', posts, lambda missing: [
+        render_to_string(POST_CARD_TEMPLATE, {'post': post})
+        for post in missing
+    ])
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE]
+
+
+def bump_content_generation():
+    get_page_cache().set_many({
+        CONTENT_GENERATION_KEY: new_version(),
+        GENERATION_CHANGED_KEY: time.time(),
+    }, None)
+
+
+def limit_for_replica_lag(timeout):
+    """Укорачивает срок кэширования данных, прочитанных из реплики.
+
+    Сразу после изменения реплика может ещё не получить его, а запись
+    под новым поколением иначе хранила бы старые данные весь срок.
+    """
+    if not reads_from_replica():
+        return timeout
+    lag = settings.REPLICA_LAG_SECONDS
+    changed_at = get_page_cache().get(GENERATION_CHANGED_KEY)
+    if changed_at is not None and time.time() - changed_at < lag:
+        return min(timeout, lag)
+    return timeout
+
+
+def get_content_changed_at():
+    """Время последней смены поколения контента, в секундах."""
+    cache = get_page_cache()
+    changed_at = cache.get(GENERATION_CHANGED_KEY)
+    if changed_at is None:
+        # Время вытеснено из кэша: надёжнее считать, что контент
+        # изменился только что.
+        changed_at = time.time()
+        cache.set(GENERATION_CHANGED_KEY, changed_at, None)
+    return changed_at
+
+
+def get_content_generation():
+    cache = get_page_cache()
+    generation = cache.get(CONTENT_GENERATION_KEY)
+    if generation is None:
+        generation = new_version()
+        cache.set(CONTENT_GENERATION_KEY, generation, None)
+    return generation
+
+
+def get_page_cache_key(request, params):
+    varying = '&'.join(
+        f'{name}={request.GET.get(name, "")}' for name in params
+    )
+    digest = hashlib.md5(
+        f'{request.path}?{varying}'.encode()
+    ).hexdigest()
+    return f'page:{get_content_generation()}:{digest}'
+
+
+def get_page_cache_timeout():
+    """Срок жизни страницы в кэше.
+
+    Не дольше, чем до ближайшей отложенной публикации: к этому моменту
+    она должна появиться в ленте.
+    """
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    if settings.PUBLICATION_SCHEDULER:
+        # Планировщик сам сменит поколение контента в момент публикации.
+        return limit_for_replica_lag(timeout)
+    now = timezone.now()
+    next_pub_date = get_next_pub_date(now)
+    if next_pub_date is not None:
+        timeout = min(timeout, int((next_pub_date - now).total_seconds()))
+    return limit_for_replica_lag(timeout)
+
+
+def get_next_pub_date(now):
+    # Запоминается до смены поколения: иначе каждый расчёт срока жизни
+    # кэша в одном запросе повторял бы этот SELECT.
+    cache = get_page_cache()
+    key = f'next_pub_date:{get_content_generation()}'
+    cached = cache.get(key)
+    if cached is not None and (not cached or cached > now):
+        return cached or None
+    next_pub_date = Post.objects.filter(
+        is_visible=True, pub_date__gt=now
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    cache.set(key, next_pub_date or '', settings.PAGE_CACHE_TIMEOUT)
+    return next_pub_date
+
+
+def is_datetime(value):
+    # Бэкенды вроде SQLite подставляют даты в запрос уже строками.
+    if isinstance(value, datetime):
+        return True
+    try:
+        return isinstance(value, str) and parse_datetime(value) is not None
+    except ValueError:
+        return False
+
+
+def get_count_signature(queryset):
+    """Сигнатура фильтра запроса для кэша счётчиков.
+
+    Параметры-даты отбрасываются: в ленте это всегда «сейчас» из
+    условия pub_date__lte, и с ними ключ менялся бы на каждом запросе.
+    Появление отложенных публикаций учитывает срок жизни записи.
+    """
+    sql, params = queryset.query.sql_with_params()
+    params = [None if is_datetime(param) else param for param in params]
+    return hashlib.md5(
+        f'{queryset.db}:{sql}:{params!r}'.encode()
+    ).hexdigest()
+
+
+def memoize_for_generation(prefix, queryset, compute, timeout):
+    """Кэширует результат запроса до смены поколения контента."""
+    cache = get_page_cache()
+    key = (f'{prefix}:{get_content_generation()}'
+           f':{get_count_signature(queryset)}')
+    value = cache.get(key)
+    if value is None:
+        value = compute(queryset)
+        timeout = min(timeout, get_page_cache_timeout())
+        if timeout > 0:
+            cache.set(key, value, timeout)
+    return value
+
+
+def get_cached_count(queryset):
+    return memoize_for_generation(
+        'count', queryset, lambda qs: qs.count(),
+        settings.PAGINATOR_COUNT_TIMEOUT
+    )
+
+
+def get_last_modified(posts):
+    """Время последнего изменения набора публикаций.
+
+    Учитывает правки (updated_at, его же трогают комментарии) и момент
+    появления отложенных публикаций (pub_date).
+    """
+    def compute(queryset):
+        now = timezone.now()
+        dates = queryset.order_by().aggregate(
+            updated=Max('updated_at'),
+            published=Max('pub_date', filter=Q(pub_date__lte=now))
+        )
+        return max(
+            (date for date in dates.values() if date is not None),
+            default=now
+        )
+
+    return memoize_for_generation(
+        'last_modified', posts, compute, settings.PAGE_CACHE_TIMEOUT
+    )
+
+
+def get_site_last_modified():
+    """Время последнего изменения ленты всех публикаций.
+
+    Любая правка сдвигает поколение контента и записывает время сдвига,
+    поэтому MAX(updated_at) по всем видимым публикациям не нужен.
+    Появление отложенных публикаций поколение не сдвигает: его
+    учитывает последняя наступившая pub_date, это запрос LIMIT 1 по
+    post_published_feed_idx.
+    """
+    changed_at = datetime.fromtimestamp(
+        get_content_changed_at(), timezone.utc
+    )
+    published_at = memoize_for_generation(
+        'published_at', Post.objects.published(),
+        lambda queryset: queryset.order_by('-pub_date').values_list(
+            'pub_date', flat=True
+        ).first(),
+        settings.PAGE_CACHE_TIMEOUT
+    )
+    return max(changed_at, published_at or changed_at)
@@ -0,0 +1,17 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    """Выполняет PRAGMA на соединении sqlite3 (DB-API, не Django).
+
+    journal_mode=WAL сохраняется в файле базы, остальные настройки
+    действуют только в пределах соединения.
+    """
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME_RE.match(name):
+            raise ImproperlyConfigured(f'Некорректное имя PRAGMA: {name!r}')
+        connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,181 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views import generic
+
+from .cache import get_post_fragments, get_site_last_modified
+from .models import Post
+from .registry import get_published_category_or_404
+from .views import ConditionalGetMixin, filter_published_posts, get_post_list
+
+User = get_user_model()
+
+
+class StreamingFeedMixin:
+    """Отдаёт XML ленты частями: шапку, готовые записи и хвост.
+
+    Записи сериализуются по одной, чтобы их можно было кэшировать
+    отдельно от ленты.
+    """
+
+    item_element = None
+    closing_tags = None
+
+    def __init__(self, *args, updated=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated = updated
+
+    def latest_post_date(self):
+        return self.updated or super().latest_post_date()
+
+    def serialize_item(self, **kwargs):
+        self.add_item(**kwargs)
+        item = self.items.pop()
+        out = StringIO()
+        handler = SimplerXMLGenerator(out, 'utf-8')
+        handler.startElement(self.item_element, self.item_attributes(item))
+        self.add_item_elements(handler, item)
+        handler.endElement(self.item_element)
+        return out.getvalue()
+
+    def stream(self, entries):
+        out = StringIO()
+        self.write(out, 'utf-8')
+        document = out.getvalue()
+        yield document[:-len(self.closing_tags)]
+        yield from entries
+        yield self.closing_tags
+
+
+class RssFeed(StreamingFeedMixin, feedgenerator.Rss201rev2Feed):
+    item_element = 'item'
+    closing_tags = '</channel></rss>'
+
+
+class AtomFeed(StreamingFeedMixin, feedgenerator.Atom1Feed):
+    item_element = 'entry'
+    closing_tags = '</feed>'
+
+
+FEED_CLASSES = {
+    'rss': RssFeed,
+    'atom': AtomFeed,
+}
+
+
+class PostFeedView(ConditionalGetMixin, generic.View):
+    """Лента публикаций; наследники задают get_posts() и
+    get_last_modified_posts() или get_last_modified().
+    """
+
+    http_method_names = ['get', 'head']
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def get_link(self):
+        return reverse('blog:index')
+
+    def get(self, request, feed_format, **kwargs):
+        feed_class = FEED_CLASSES.get(feed_format)
+        if feed_class is None:
+            raise Http404('Неизвестный формат ленты.')
+        posts = list(get_post_list(self.get_posts())[:settings.FEED_POSTS])
+        feed = feed_class(
+            title=self.title,
+            link=request.build_absolute_uri(self.get_link()),
+            description=self.description,
+            feed_url=request.build_absolute_uri(),
+            language=settings.LANGUAGE_CODE,
+            updated=self.get_last_modified(),
+        )
+        entries = get_post_fragments(
+            # Ссылки в записях абсолютные: ключ зависит от схемы и хоста.
+            f'feed_entry:{feed_format}:{request.scheme}:{request.get_host()}',
+            posts,
+            lambda missing: self.serialize_posts(feed, missing)
+        )
+        return StreamingHttpResponse(
+            feed.stream(entries), content_type=feed.content_type
+        )
+
+    def serialize_posts(self, feed, posts):
+        # Текст в ленте публикаций отложен: догружаем его одним запросом
+        # и только для записей, которых нет в кэше. Публикацию могли
+        # удалить между запросами: её запись остаётся без текста.
+        texts = dict(Post.objects.filter(
+            pk__in=[post.pk for post in posts]
+        ).values_list('pk', 'text'))
+        return [
+            feed.serialize_item(**self.get_item(post, texts.get(post.pk, '')))
+            for post in posts
+        ]
+
+    def get_item(self, post, text):
+        link = self.request.build_absolute_uri(
+            reverse('blog:post_detail', kwargs={'post_id': post.pk})
+        )
+        return {
+            'title': post.title,
+            'link': link,
+            'unique_id': link,
+            'description': text,
+            'author_name': post.author.username,
+            'pubdate': post.pub_date,
+            'updateddate': post.updated_at,
+            'categories': (post.category.title,) if post.category else (),
+        }
+
+
+class LatestPostsFeed(PostFeedView):
+    def get_last_modified(self):
+        return get_site_last_modified()
+
+    def get_posts(self):
+        return filter_published_posts()
+
+
+class CategoryPostsFeed(PostFeedView):
+    def get_last_modified_posts(self):
+        return filter_published_posts().filter(
+            category__slug=self.kwargs['category_slug']
+        )
+
+    def get_posts(self):
+        self.category = get_published_category_or_404(
+            self.kwargs['category_slug']
+        )
+        self.title = f'Блогикум — {self.category.title}'
+        self.description = self.category.description
+        return filter_published_posts(self.category.posts)
+
+    def get_link(self):
+        return reverse(
+            'blog:category_posts',
+            kwargs={'category_slug': self.category.slug}
+        )
+
+
+class AuthorPostsFeed(PostFeedView):
+    def get_last_modified_posts(self):
+        return filter_published_posts().filter(
+            author__username=self.kwargs['username']
+        )
+
+    def get_posts(self):
+        self.author = get_object_or_404(
+            User, username=self.kwargs['username']
+        )
+        self.title = f'Блогикум — {self.author.username}'
+        self.description = f'Публикации пользователя {self.author.username}'
+        return filter_published_posts(self.author.posts)
+
+    def get_link(self):
+        return reverse(
+            'blog:profile', kwargs={'username': self.author.username}
+        )
@@ -1,12 +1,73 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+
+from . import registry
 from .models import Post, Comment
 
 
+class RegistryChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return (len(self.field.get_objects())
+                + (self.field.empty_label is not None))
+
+    def __bool__(self):
+        return (self.field.empty_label is not None
+                or bool(self.field.get_objects()))
+
+
+class RegistryChoiceField(forms.ModelChoiceField):
+    """Выбор из blog.registry: виджет и проверка обходятся без базы.
+
+    Наследники задают функции реестра get_objects() и get_object(pk).
+    """
+
+    iterator = RegistryChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            return value
+        try:
+            obj = self.get_object(self.queryset.model._meta.pk.to_python(
+                value
+            ))
+        except ValidationError:
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice', params={'value': value}
+            )
+        return obj
+
+
+class CategoryChoiceField(RegistryChoiceField):
+    get_objects = staticmethod(registry.get_categories)
+    get_object = staticmethod(registry.get_category)
+
+
+class LocationChoiceField(RegistryChoiceField):
+    get_objects = staticmethod(registry.get_locations)
+    get_object = staticmethod(registry.get_location)
+
+
 class PostCreateForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ['title', 'text', 'pub_date',
                   'image', 'location', 'category', 'is_published']
+        field_classes = {
+            'location': LocationChoiceField,
+            'category': CategoryChoiceField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'},
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import bump_content_generation, bump_global_card_version
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы публикаций пакетами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций обрабатывать за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_pk, updated = 0, 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk').only('pk', 'text', 'excerpt')[:batch_size]
+            )
+            if not batch:
+                break
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ['excerpt'])
+            updated += len(changed)
+            last_pk = batch[-1].pk
+
+        if updated:
+            bump_global_card_version()
+            bump_content_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов: {updated}'
+        ))
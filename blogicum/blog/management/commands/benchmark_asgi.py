@@ -0,0 +1,179 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.urls import reverse
+
+from blog import async_views, views
+from .benchmark_urls import PERCENTILES, get_sample_post, percentile
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность публичных страниц при '
+            'одновременных запросах: синхронные представления в потоках '
+            '(WSGI), синхронные представления под ASGI и асинхронные '
+            'представления из blog.async_views.')
+
+    modes = ('wsgi', 'asgi', 'asgi-async')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов делать к каждой странице в каждом режиме.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Сколько запросов выполняется одновременно.'
+        )
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='Задержка каждого SQL-запроса в мс, как у базы по сети.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Куда сохранить результаты в JSON.'
+        )
+
+    def handle(self, *args, requests, concurrency, db_latency, output,
+               **options):
+        post = get_sample_post()
+        if db_latency:
+            self.add_db_latency(db_latency / 1000)
+        pages = {
+            'blog:index': ('PostListView', {}),
+            'blog:post_detail': ('PostDetailView', {'post_id': post.pk}),
+            'blog:category_posts': (
+                'CategoryPostListView',
+                {'category_slug': post.category.slug}
+            ),
+            'blog:profile': (
+                'ProfileDetailView', {'username': post.author.username}
+            ),
+        }
+        self.factory = RequestFactory(SERVER_NAME='localhost')
+        results = []
+        for name, (view_name, kwargs) in pages.items():
+            url = reverse(name, kwargs=kwargs)
+            sync_view = getattr(views, view_name).as_view()
+            async_view = getattr(async_views, view_name).as_view()
+            runs = {
+                'wsgi': lambda: self.run_threads(
+                    sync_view, url, kwargs, requests, concurrency
+                ),
+                'asgi': lambda: async_to_sync(self.run_sync_under_asgi)(
+                    sync_view, url, kwargs, requests, concurrency
+                ),
+                'asgi-async': lambda: async_to_sync(self.run_async)(
+                    async_view, url, kwargs, requests, concurrency
+                ),
+            }
+            for mode in self.modes:
+                timings, elapsed = runs[mode]()
+                timings.sort()
+                result = {
+                    'name': name,
+                    'mode': mode,
+                    'requests_per_second': round(requests / elapsed, 1),
+                    **{
+                        f'p{rank}_ms': round(percentile(timings, rank), 3)
+                        for rank in PERCENTILES
+                    },
+                }
+                results.append(result)
+                self.stdout.write(
+                    f'{name:<22} {mode:<11} '
+                    f'{result["requests_per_second"]:>8.1f} запр./с '
+                    + ' '.join(
+                        f'p{rank}={result[f"p{rank}_ms"]:.1f}мс'
+                        for rank in PERCENTILES
+                    )
+                )
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump({
+                    'requests': requests,
+                    'concurrency': concurrency,
+                    'db_latency': db_latency,
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def add_db_latency(seconds):
+        """Добавляет задержку ко всем запросам всех потоков."""
+        def delay(execute, sql, params, many, context):
+            sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        for connection in connections.all():
+            install(connection)
+        connection_created.connect(install, weak=False)
+
+    def make_request(self, url):
+        # HEAD проходит весь путь чтения и отрисовки, но не попадает
+        # в кэш страниц: иначе все запросы, кроме первого, его минуют.
+        request = self.factory.head(url)
+        request.user = AnonymousUser()
+        return request
+
+    def call_sync(self, view, url, kwargs):
+        started = perf_counter()
+        try:
+            response = view(self.make_request(url), **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        finally:
+            close_old_connections()
+        return (perf_counter() - started) * 1000
+
+    def run_threads(self, view, url, kwargs, requests, concurrency):
+        """Потоки сервера WSGI, каждый со своим соединением с базой."""
+        started = perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            timings = list(executor.map(
+                lambda _: self.call_sync(view, url, kwargs), range(requests)
+            ))
+        return timings, perf_counter() - started
+
+    async def run_concurrently(self, request_once, requests, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                started = perf_counter()
+                await request_once()
+                return (perf_counter() - started) * 1000
+
+        started = perf_counter()
+        timings = await asyncio.gather(*(timed() for _ in range(requests)))
+        return list(timings), perf_counter() - started
+
+    async def run_sync_under_asgi(self, view, url, kwargs, requests,
+                                  concurrency):
+        """Так Django 3.2 выполняет синхронное представление под ASGI."""
+        async def request_once():
+            response = await sync_to_async(view, thread_sensitive=True)(
+                self.make_request(url), **kwargs
+            )
+            if hasattr(response, 'render'):
+                await sync_to_async(response.render, thread_sensitive=True)()
+
+        return await self.run_concurrently(
+            request_once, requests, concurrency
+        )
+
+    async def run_async(self, view, url, kwargs, requests, concurrency):
+        return await self.run_concurrently(
+            lambda: view(self.make_request(url), **kwargs),
+            requests, concurrency
+        )
@@ -0,0 +1,139 @@
+import os
+import random
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.db import apply_sqlite_pragmas
+
+# Упрощённые таблицы публикаций и комментариев: нагрузка повторяет ленту,
+# страницу публикации и CommentCreateView.
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT, '
+    'pub_date TEXT, comment_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX post_pub_date_idx ON post (pub_date)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, '
+    'post_id INTEGER NOT NULL REFERENCES post (id), text TEXT, '
+    'created_at TEXT)',
+    'CREATE INDEX comment_post_idx ON comment (post_id, created_at)',
+)
+FEED_SQL = (
+    'SELECT id, title, comment_count FROM post '
+    'ORDER BY pub_date DESC LIMIT 10 OFFSET ?'
+)
+COMMENTS_SQL = (
+    'SELECT text FROM comment WHERE post_id = ? '
+    'ORDER BY created_at LIMIT 50'
+)
+INSERT_COMMENT_SQL = (
+    "INSERT INTO comment (post_id, text, created_at) "
+    "VALUES (?, 'Комментарий', datetime('now'))"
+)
+UPDATE_POST_SQL = (
+    'UPDATE post SET comment_count = comment_count + 1 WHERE id = ?'
+)
+
+
+def create_database(path, posts, pragmas):
+    connection = sqlite3.connect(path, isolation_level=None)
+    apply_sqlite_pragmas(connection, pragmas)
+    for sql in SCHEMA:
+        connection.execute(sql)
+    connection.execute('BEGIN')
+    connection.executemany(
+        "INSERT INTO post (title, pub_date) "
+        "VALUES (?, datetime('now', ? || ' minutes'))",
+        ((f'Публикация {number}', -number) for number in range(posts))
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def run_worker(path, pragmas, posts, duration, write_ratio, seed):
+    """Смешанная нагрузка одного процесса.
+
+    Возвращает (чтений, записей, ошибок блокировки).
+    """
+    rng = random.Random(seed)
+    # timeout=5 — значение по умолчанию в sqlite3 и в Django.
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    apply_sqlite_pragmas(connection, pragmas)
+    reads = writes = errors = 0
+    deadline = perf_counter() + duration
+    while perf_counter() < deadline:
+        post_id = rng.randint(1, posts)
+        try:
+            if rng.random() < write_ratio:
+                # Как transaction.atomic() в Django: отложенный BEGIN.
+                connection.execute('BEGIN')
+                try:
+                    connection.execute(INSERT_COMMENT_SQL, (post_id,))
+                    connection.execute(UPDATE_POST_SQL, (post_id,))
+                    connection.execute('COMMIT')
+                except sqlite3.Error:
+                    connection.execute('ROLLBACK')
+                    raise
+                writes += 1
+            else:
+                connection.execute(
+                    FEED_SQL, (rng.randrange(0, posts, 10),)
+                ).fetchall()
+                connection.execute(COMMENTS_SQL, (post_id,)).fetchall()
+                reads += 1
+        except sqlite3.OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            errors += 1
+    connection.close()
+    return reads, writes, errors
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite при смешанной '
+            'нагрузке чтения и записи без PRAGMA и с SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число параллельных процессов.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность каждого прогона, в секундах.'
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля операций записи.'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=10000,
+            help='Сколько публикаций создать в тестовой базе.'
+        )
+
+    def handle(self, *args, workers, duration, write_ratio, posts,
+               **options):
+        scenarios = {
+            'Без PRAGMA': {'journal_mode': 'DELETE'},
+            'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (title, pragmas) in enumerate(scenarios.items()):
+                path = os.path.join(directory, f'benchmark{number}.sqlite3')
+                create_database(path, posts, pragmas)
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(run_worker, path, pragmas, posts,
+                                    duration, write_ratio, seed)
+                        for seed in range(workers)
+                    ]
+                    results = [future.result() for future in futures]
+                reads, writes, errors = map(sum, zip(*results))
+                self.stdout.write(self.style.MIGRATE_LABEL(
+                    f'{title}: чтений {reads / duration:.0f}/с, '
+                    f'записей {writes / duration:.0f}/с, '
+                    f'ошибок блокировки {errors}'
+                ))
@@ -0,0 +1,180 @@
+import json
+import math
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from blog.models import Comment, Post
+from blog.querybudget import record_queries
+from pages import urls as pages_urls
+
+URL_MODULES = (blog_urls, pages_urls)
+PERCENTILES = (50, 95, 99)
+# Представления, которые принимают только POST.
+POST_ONLY = {'blog:add_comment'}
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга; values отсортированы."""
+    index = max(0, math.ceil(rank / 100 * len(values)) - 1)
+    return values[index]
+
+
+def get_sample_post():
+    """Опубликованная публикация с наибольшим числом комментариев."""
+    post = Post.objects.published().order_by(
+        '-comment_count', '-pk'
+    ).select_related('author', 'category').first()
+    if post is None:
+        raise CommandError(
+            'Нет опубликованных публикаций: выполните seed_blog.'
+        )
+    return post
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержку (p50/p95/p99) и число SQL-запросов для '
+            'каждого URL из blog/urls.py и pages/urls.py и сохраняет '
+            'результат в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько запросов делать к каждому URL.'
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Куда сохранить результаты.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON прошлого прогона для сравнения p95.'
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэши перед каждым запросом.'
+        )
+
+    def handle(self, *args, requests, output, compare, cold, **options):
+        post = get_sample_post()
+        # Комментарий автора публикации, чтобы формы правки открывались.
+        comments = Comment.objects.filter(post=post)
+        comment = (comments.filter(author=post.author).first()
+                   or comments.first())
+        kwargs = {
+            'post_id': post.pk,
+            'comment_id': comment.pk if comment else 0,
+            'category_slug': post.category.slug,
+            'username': post.author.username,
+            'feed_format': 'atom',
+        }
+        query_strings = {
+            'blog:search': {'q': post.title.split()[0]},
+        }
+        author_client = Client(SERVER_NAME='localhost')
+        author_client.force_login(post.author)
+        clients = {
+            'anonymous': Client(SERVER_NAME='localhost'),
+            'author': author_client,
+        }
+
+        results = []
+        for module in URL_MODULES:
+            for pattern in module.urlpatterns:
+                name = f'{module.app_name}:{pattern.name}'
+                if name in POST_ONLY:
+                    continue
+                url = reverse(name, kwargs={
+                    key: kwargs[key] for key in pattern.pattern.converters
+                })
+                for client_name, client in clients.items():
+                    result = self.measure(
+                        client, url, query_strings.get(name, {}),
+                        requests, cold
+                    )
+                    result.update(name=name, url=url, client=client_name)
+                    results.append(result)
+                    self.report(result)
+
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump({
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'requests': requests,
+                'cold': cold,
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+                'results': results,
+            }, file, ensure_ascii=False, indent=2)
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты сохранены в {output}')
+        )
+        if compare:
+            self.compare(compare, results)
+
+    @staticmethod
+    def measure(client, url, data, requests, cold):
+        timings, queries, statuses = [], [], set()
+        for _ in range(requests):
+            if cold:
+                for cache in caches.all():
+                    cache.clear()
+            with record_queries() as report:
+                started = perf_counter()
+                response = client.get(url, data)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((perf_counter() - started) * 1000)
+            queries.append(report.count)
+            statuses.add(response.status_code)
+        timings.sort()
+        result = {
+            f'p{rank}_ms': round(percentile(timings, rank), 3)
+            for rank in PERCENTILES
+        }
+        result.update(
+            queries_per_request=sum(queries) / len(queries),
+            max_queries=max(queries),
+            statuses=sorted(statuses),
+        )
+        return result
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["name"]:<24} {result["client"]:<10} '
+            + ' '.join(
+                f'p{rank}={result[f"p{rank}_ms"]:.1f}мс'
+                for rank in PERCENTILES
+            )
+            + f' запросов={result["queries_per_request"]:.1f}'
+            f' {result["statuses"]}'
+        )
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as file:
+            previous = {
+                (item['name'], item['client']): item
+                for item in json.load(file)['results']
+            }
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Сравнение с {path}'))
+        for result in results:
+            old = previous.get((result['name'], result['client']))
+            if old is None or not old['p95_ms']:
+                continue
+            change = (result['p95_ms'] / old['p95_ms'] - 1) * 100
+            style = (self.style.ERROR if change > settings.BENCHMARK_TOLERANCE
+                     else self.style.SUCCESS)
+            self.stdout.write(style(
+                f'{result["name"]:<24} {result["client"]:<10} '
+                f'p95 {old["p95_ms"]:.1f} → {result["p95_ms"]:.1f} мс '
+                f'({change:+.0f}%), запросов '
+                f'{old["queries_per_request"]:.1f} → '
+                f'{result["queries_per_request"]:.1f}'
+            ))
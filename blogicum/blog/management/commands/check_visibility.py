@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.cache import bump_content_generation, bump_global_card_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Ищет публикации, у которых флаг is_visible разошёлся '
+            'с флагами публикации и категории.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Исправить найденные расхождения.'
+        )
+
+    def handle(self, *args, fix, **options):
+        should_be_visible = Post.objects.should_be_visible()
+        wrongly_hidden = should_be_visible.filter(is_visible=False)
+        wrongly_shown = Post.objects.filter(is_visible=True).filter(
+            Q(is_published=False)
+            | Q(category__isnull=True)
+            | Q(category__is_published=False)
+        )
+        hidden, shown = wrongly_hidden.count(), wrongly_shown.count()
+
+        if fix and (hidden or shown):
+            wrongly_hidden.update(is_visible=True)
+            wrongly_shown.update(is_visible=False)
+            bump_global_card_version()
+            bump_content_generation()
+
+        style = self.style.WARNING if hidden or shown else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Скрыты по ошибке: {hidden}, показаны по ошибке: {shown}'
+            + (' (исправлено)' if fix and (hidden or shown) else '')
+        ))
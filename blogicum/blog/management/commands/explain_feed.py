@@ -0,0 +1,99 @@
+import re
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.models import Comment, Post
+from blog.views import filter_published_posts
+
+# Параметры планировщика PostgreSQL, запрещающие чтение по индексам.
+POSTGRESQL_INDEX_SCANS = (
+    'enable_indexscan', 'enable_indexonlyscan', 'enable_bitmapscan',
+)
+
+
+def without_sqlite_indexes(sql):
+    """Добавляет NOT INDEXED к таблицам публикаций и комментариев."""
+    for model in (Post, Comment):
+        table = connection.ops.quote_name(model._meta.db_table)
+        sql = re.sub(
+            rf'\b(FROM|JOIN) {re.escape(table)}(?= |$)',
+            lambda match: f'{match.group(0)} NOT INDEXED', sql
+        )
+    return sql
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает планы и время запросов ленты, категории, профиля '
+            'и комментариев с индексами и без них.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый запрос для замера времени.'
+        )
+
+    def handle(self, *args, repeat, **options):
+        queries = self.get_queries()
+        self.report('С индексами', queries, repeat)
+        # Индексы отключаются подсказками планировщику, а не удалением:
+        # DROP INDEX заблокировал бы таблицы на всё время замера.
+        if connection.vendor == 'sqlite':
+            self.report(
+                'Без индексов', queries, repeat, without_sqlite_indexes
+            )
+        elif connection.vendor == 'postgresql':
+            with transaction.atomic(), connection.cursor() as cursor:
+                for name in POSTGRESQL_INDEX_SCANS:
+                    cursor.execute(f'SET LOCAL {name} = off')
+                self.report('Без индексов', queries, repeat)
+        else:
+            self.stdout.write(self.style.WARNING(
+                'Замер без индексов доступен для SQLite и PostgreSQL.'
+            ))
+
+    def get_queries(self):
+        post = Post.objects.order_by('?').first()
+        base = Post.objects.select_related('category', 'location', 'author')
+        return {
+            'Лента': filter_published_posts(base).order_by('-pub_date'),
+            'Категория': filter_published_posts(
+                base.filter(category_id=post and post.category_id)
+            ).order_by('-pub_date'),
+            'Профиль': base.filter(
+                author_id=post and post.author_id
+            ).order_by('-pub_date'),
+            'Комментарии': Comment.objects.select_related('author').filter(
+                post_id=post and post.pk
+            ),
+        }
+
+    def report(self, title, queries, repeat, rewrite=None):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in queries.items():
+            sql, params = queryset[
+                :settings.POSTS_PER_PAGE
+            ].query.sql_with_params()
+            if rewrite is not None:
+                sql = rewrite(sql)
+            # Комментарий делает текст запроса уникальным: иначе SQLite
+            # возвращает план из кэша подготовленных выражений.
+            sql = f'{sql} /* {title} */'
+            with connection.cursor() as cursor:
+                started = perf_counter()
+                for _ in range(repeat):
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                elapsed = (perf_counter() - started) / repeat * 1000
+                self.stdout.write(
+                    self.style.MIGRATE_LABEL(f'  {name}: {elapsed:.2f} мс')
+                )
+                cursor.execute(
+                    f'{connection.ops.explain_query_prefix()} {sql}', params
+                )
+                for row in cursor.fetchall():
+                    self.stdout.write(
+                        '    ' + ' '.join(str(column) for column in row)
+                    )
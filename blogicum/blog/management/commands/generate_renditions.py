@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.thumbnails import generate_renditions
+
+
+def render_image(name, force):
+    try:
+        return name, generate_renditions(name, force=force), None
+    except OSError as error:
+        return name, 0, str(error)
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие превью для изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов для обработки изображений.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать превью, даже если они уже есть.'
+        )
+
+    def handle(self, *args, workers, force, **options):
+        names = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).values_list('image', flat=True).distinct().iterator()
+
+        created = failed = 0
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=django.setup) as pool:
+            futures = [pool.submit(render_image, name, force)
+                       for name in names]
+            for future in as_completed(futures):
+                name, count, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                created += count
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано превью: {created}, ошибок: {failed}'
+        ))
@@ -0,0 +1,27 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс публикаций и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей индексировать за одну транзакцию.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        if not search_available():
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite.'
+            )
+        started = perf_counter()
+        indexed = rebuild_search_index(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано записей: {indexed}'
+            f' за {perf_counter() - started:.1f} с'
+        ))
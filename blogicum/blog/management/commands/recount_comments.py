@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from blog.cache import bump_post_card_versions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает разошедшиеся счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций обновлять одним запросом.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать число расхождений, ничего не меняя.'
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        drifted = Post.objects.order_by().annotate(
+            actual=Count('comments')
+        ).exclude(comment_count=F('actual')).values_list('pk', 'actual')
+
+        posts = [Post(pk=pk, comment_count=actual) for pk, actual in drifted]
+        if not dry_run:
+            for start in range(0, len(posts), batch_size):
+                with transaction.atomic():
+                    Post.objects.bulk_update(
+                        posts[start:start + batch_size], ['comment_count']
+                    )
+            bump_post_card_versions(*(post.pk for post in posts))
+
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} расхождений счётчика комментариев: {len(posts)}'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import PublicationScheduler
+
+
+class Command(BaseCommand):
+    help = ('Следит за отложенными публикациями и сбрасывает кэш '
+            'страниц, когда они появляются в ленте.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить одну проверку и завершиться.'
+        )
+        parser.add_argument(
+            '--interval', type=int,
+            help='Максимальная пауза между проверками, в секундах.'
+        )
+
+    def handle(self, *args, once, interval, **options):
+        scheduler = PublicationScheduler(interval)
+        if once:
+            delay = scheduler.tick()
+            self.stdout.write(f'Следующая проверка через {delay:.0f} с')
+            return
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -0,0 +1,27 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.pubsub import parse_address, serve_relay
+
+
+class Command(BaseCommand):
+    help = ('Запускает ретранслятор событий между процессами сервера, '
+            'например для потока новых комментариев.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address', default=settings.PUBSUB_RELAY,
+            help='Адрес host:port; по умолчанию PUBSUB_RELAY.'
+        )
+
+    def handle(self, *args, address, **options):
+        if not address:
+            raise CommandError('Укажите --address или PUBSUB_RELAY.')
+        host, port = parse_address(address)
+        self.stdout.write(f'Ретранслятор слушает {host}:{port}')
+        try:
+            asyncio.run(serve_relay(host, port))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,287 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.cache import bump_content_generation, bump_global_card_version
+from blog.models import Category, Comment, Location, Post, make_excerpt
+from blog.search import rebuild_search_index, search_available
+
+User = get_user_model()
+
+PASSWORD = 'blogicum'
+HISTORY_DAYS = 730
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Отключает auto_now/auto_now_add: bulk_create иначе перезапишет
+    сгенерированные даты текущим временем.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными для нагрузочных '
+            'тестов. Популярность авторов, категорий и публикаций '
+            f'распределена по закону Ципфа. Пароль пользователей: {PASSWORD}')
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Число пользователей.'),
+            ('categories', 20, 'Число категорий.'),
+            ('locations', 200, 'Число местоположений.'),
+            ('posts', 20000, 'Число публикаций.'),
+            ('comments', 100000, 'Число комментариев.'),
+            ('batch-size', 5000, 'Сколько объектов вставлять за запрос.'),
+            ('seed', 0, 'Зерно генератора: одинаковое даёт те же данные.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель распределения Ципфа; 0 — равномерно.'
+        )
+
+    def handle(self, *args, users, categories, locations, posts, comments,
+               batch_size, seed, skew, **options):
+        if posts and not (users and categories):
+            raise CommandError(
+                'Для публикаций нужны хотя бы один пользователь и категория.'
+            )
+        if comments and not posts:
+            raise CommandError('Для комментариев нужны публикации.')
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.skew = skew
+        self.now = timezone.now()
+        fake = Faker('ru_RU')
+        fake.seed_instance(seed)
+        # Faker медленный: тексты собираются из заранее созданных кусков.
+        self.sentences = [fake.sentence(nb_words=8) for _ in range(2000)]
+        self.paragraphs = [fake.paragraph(nb_sentences=5)
+                           for _ in range(1000)]
+        self.names = [fake.user_name() for _ in range(1000)]
+        self.cities = [fake.city() for _ in range(500)]
+
+        started = perf_counter()
+        with explicit_timestamps(User, Category, Location, Post, Comment):
+            user_ids = self.create_users(users)
+            category_ids = self.create_categories(categories)
+            location_ids = self.create_locations(locations)
+            post_dates = self.create_posts(
+                posts, comments, user_ids, category_ids, location_ids
+            )
+            self.create_comments(post_dates, user_ids)
+
+        if search_available():
+            rebuild_search_index(batch_size)
+        bump_global_card_version()
+        bump_content_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {users}, категорий {categories}, '
+            f'мест {locations}, публикаций {posts}, '
+            f'комментариев {comments} за {perf_counter() - started:.1f} с'
+        ))
+
+    def zipf_picker(self, population):
+        """Возвращает функцию выбора k элементов с перекосом популярности."""
+        population = list(population)
+        self.rng.shuffle(population)
+        cum_weights = list(accumulate(
+            1 / (rank + 1) ** self.skew for rank in range(len(population))
+        ))
+        return lambda k: self.rng.choices(
+            population, cum_weights=cum_weights, k=k
+        )
+
+    def random_date(self, days=HISTORY_DAYS):
+        return self.now - timedelta(seconds=self.rng.random() * days * 86400)
+
+    def insert(self, model, objects, return_ids=True):
+        """Вставляет объекты пакетами и возвращает их id по порядку.
+
+        SQLite в Django 3.2 не возвращает id из bulk_create, поэтому они
+        выбираются после вставки.
+        """
+        last_pk = self.get_last_pk(model)
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                self.flush(model, batch)
+        self.flush(model, batch)
+        if not return_ids:
+            return None
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    @staticmethod
+    def get_last_pk(model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    def get_numbers(self, model, count):
+        """Номера для уникальных имён и slug.
+
+        Продолжают id уже созданных записей, поэтому повторный запуск
+        дополняет базу, а не упирается в ограничения уникальности.
+        """
+        start = self.get_last_pk(model) + 1
+        return range(start, start + count)
+
+    @staticmethod
+    def flush(model, batch):
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            batch.clear()
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        return self.insert(User, (
+            User(
+                username=f'{self.rng.choice(self.names)}_{number}',
+                email=f'user{number}@example.com',
+                password=password,
+                date_joined=self.random_date(),
+            )
+            for number in self.get_numbers(User, count)
+        ))
+
+    def create_categories(self, count):
+        return self.insert(Category, (
+            Category(
+                title=self.rng.choice(self.sentences)[:256],
+                description=self.rng.choice(self.paragraphs),
+                slug=f'category-{number}',
+                is_published=self.rng.random() < 0.9,
+                created_at=self.random_date(),
+            )
+            for number in self.get_numbers(Category, count)
+        ))
+
+    def create_locations(self, count):
+        return self.insert(Location, (
+            Location(
+                name=self.rng.choice(self.cities),
+                is_published=self.rng.random() < 0.9,
+                created_at=self.random_date(),
+            )
+            for _ in range(count)
+        ))
+
+    def create_posts(self, count, comments, user_ids, category_ids,
+                     location_ids):
+        """Создаёт публикации.
+
+        Число комментариев каждой публикации выбирается заранее, чтобы
+        сразу записать comment_count. Возвращает (id, дата, комментарии)
+        для публикаций с комментариями.
+        """
+        comment_counts = [0] * count
+        pick_post = self.zipf_picker(range(count))
+        for start in range(0, comments, self.batch_size):
+            for index in pick_post(min(self.batch_size, comments - start)):
+                comment_counts[index] += 1
+
+        pick_author = self.zipf_picker(user_ids)
+        pick_category = self.zipf_picker(category_ids)
+        published_categories = set(Category.objects.filter(
+            pk__in=category_ids, is_published=True
+        ).values_list('pk', flat=True))
+        dates = []
+
+        def generate():
+            for number in range(count):
+                if number % self.batch_size == 0:
+                    authors = iter(pick_author(self.batch_size))
+                    categories = iter(pick_category(self.batch_size))
+                category_id = next(categories)
+                # Около 1% публикаций отложены на будущее.
+                if self.rng.random() < 0.01:
+                    pub_date = self.now + timedelta(
+                        seconds=self.rng.random() * 30 * 86400
+                    )
+                else:
+                    pub_date = self.random_date()
+                dates.append(pub_date)
+                is_published = self.rng.random() < 0.95
+                text = ' '.join(self.rng.choices(
+                    self.paragraphs, k=self.rng.randint(1, 4)
+                ))
+                yield Post(
+                    title=self.rng.choice(self.sentences)[:256],
+                    text=text,
+                    excerpt=make_excerpt(text),
+                    pub_date=pub_date,
+                    created_at=pub_date,
+                    updated_at=pub_date,
+                    author_id=next(authors),
+                    category_id=category_id,
+                    location_id=(self.rng.choice(location_ids)
+                                 if location_ids
+                                 and self.rng.random() < 0.7 else None),
+                    is_published=is_published,
+                    is_visible=(is_published
+                                and category_id in published_categories),
+                    comment_count=comment_counts[number],
+                )
+
+        post_ids = self.insert(Post, generate())
+        return [
+            (post_id, date, comments)
+            for post_id, date, comments in zip(
+                post_ids, dates, comment_counts
+            )
+            if comments
+        ]
+
+    def create_comments(self, post_dates, user_ids):
+        pick_author = self.zipf_picker(user_ids)
+
+        def generate():
+            authors = iter(())
+            for post_id, pub_date, comments in post_dates:
+                for _ in range(comments):
+                    author_id = next(authors, None)
+                    if author_id is None:
+                        authors = iter(pick_author(self.batch_size))
+                        author_id = next(authors)
+                    created_at = min(
+                        self.now,
+                        pub_date + timedelta(
+                            seconds=self.rng.random() * 30 * 86400
+                        )
+                    )
+                    yield Comment(
+                        post_id=post_id,
+                        author_id=author_id,
+                        text=self.rng.choice(self.sentences),
+                        created_at=created_at,
+                    )
+
+        self.insert(Comment, generate(), return_ids=False)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+
+from .querybudget import get_query_budget, record_queries
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """Промежуточный слой, работающий и в WSGI, и в ASGI.
+
+    Под ASGI Django вызывает его в цикле событий, и асинхронные
+    представления не уходят в общий поток sync_to_async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django узнаёт, что __call__ возвращает корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.process(request)
+
+    async def __acall__(self, request):
+        return await self.aprocess(request)
+
+
+class PrimaryStickinessMiddleware(AsyncCapableMiddleware):
+    """Read-your-writes при чтении из реплик.
+
+    Запросы, меняющие данные, целиком работают с основной базой и
+    ставят cookie, по которой следующие запросы клиента ещё
+    REPLICA_LAG_SECONDS читают из основной базы, пока реплики
+    догоняют её.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def writes(self, request):
+        return request.method not in self.safe_methods
+
+    def sticks_to_primary(self, request):
+        return (self.writes(request)
+                or settings.REPLICA_STICKY_COOKIE in request.COOKIES)
+
+    def stick(self, request, response):
+        if self.writes(request) and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_LAG_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process(self, request):
+        if not self.sticks_to_primary(request):
+            return self.get_response(request)
+        with use_primary():
+            response = self.get_response(request)
+        return self.stick(request, response)
+
+    async def aprocess(self, request):
+        if not self.sticks_to_primary(request):
+            return await self.get_response(request)
+        with use_primary():
+            response = await self.get_response(request)
+        return self.stick(request, response)
+
+
+class QueryBudgetMiddleware(AsyncCapableMiddleware):
+    """Пишет предупреждение в лог, если представление превысило бюджет
+    запросов из QUERY_BUDGETS или повторяет одинаковые запросы (N+1).
+    """
+
+    def process(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        with record_queries() as report:
+            response = self.get_response(request)
+        return self.check(request, response, report)
+
+    async def aprocess(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return await self.get_response(request)
+        with record_queries() as report:
+            response = await self.get_response(request)
+        return self.check(request, response, report)
+
+    @staticmethod
+    def check(request, response, report):
+        match = request.resolver_match
+        report.view_name = match.view_name if match else request.path
+        for problem in report.get_problems(
+            get_query_budget(report.view_name)
+        ):
+            logger.warning(problem, extra={'request': request})
+        response['X-DB-Queries'] = report.count
+        response['X-DB-Time'] = f'{report.duration * 1000:.1f}ms'
+        return response
+
+
+class SessionBackendMiddleware:
+    """Переводит сессии со стандартного ModelBackend на
+    CachedModelBackend.
+
+    django.contrib.auth.get_user не загружает пользователя, если бэкенда
+    из сессии нет в AUTHENTICATION_BACKENDS, а второй бэкенд в списке
+    удвоил бы стоимость каждого неудачного входа. Стоит до
+    AuthenticationMiddleware.
+    """
+
+    replaced_backends = ('django.contrib.auth.backends.ModelBackend',)
+    backend = 'blog.auth.CachedModelBackend'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = request.session
+        stored = session.get(BACKEND_SESSION_KEY)
+        if (stored in self.replaced_backends
+                and stored not in settings.AUTHENTICATION_BACKENDS):
+            session[BACKEND_SESSION_KEY] = self.backend
+        return self.get_response(request)
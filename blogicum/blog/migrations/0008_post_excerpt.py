@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator():
+        post.excerpt = Truncator(post.text).words(
+            settings.POST_EXCERPT_WORDS, truncate=' …'
+        )
+        batch.append(post)
+        if len(batch) == EXCERPT_BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
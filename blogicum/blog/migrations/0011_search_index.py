@@ -0,0 +1,41 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE blog_search USING fts5("
+    "title, body, post_id UNINDEXED, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+# Совпадение в заголовке весит больше, чем в тексте или комментарии.
+RANK_SQL = (
+    "INSERT INTO blog_search(blog_search, rank) "
+    "VALUES('rank', 'bm25(10.0, 1.0, 0.0)')"
+)
+FILL_SQL = (
+    "INSERT INTO blog_search(rowid, title, body, post_id) "
+    "SELECT id * 2, title, text, id FROM blog_post",
+    "INSERT INTO blog_search(rowid, title, body, post_id) "
+    "SELECT id * 2 + 1, '', text, post_id FROM blog_comment",
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in (CREATE_SQL, RANK_SQL, *FILL_SQL):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import Truncator
 
 User = get_user_model()
 
@@ -54,6 +57,29 @@ class Location(BaseModel):
         return self.name
 
 
+def make_excerpt(text):
+    return Truncator(text).words(settings.POST_EXCERPT_WORDS, truncate=' …')
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_visible=True, pub_date__lte=timezone.now())
+
+    def visible_to(self, user):
+        """Публикации, которые может открыть пользователь.
+
+        Автор видит все свои публикации, остальные — только
+        опубликованные. Проверка делается одним запросом.
+        """
+        published = models.Q(is_visible=True, pub_date__lte=timezone.now())
+        if user.is_authenticated:
+            return self.filter(published | models.Q(author=user))
+        return self.filter(published)
+
+    def should_be_visible(self):
+        return self.filter(is_published=True, category__is_published=True)
+
+
 class Post(BaseModel):
     title = models.CharField(
         'Заголовок',
@@ -93,15 +119,86 @@ class Post(BaseModel):
         blank=True,
         help_text='Прикрепите изображение к публикации.'
     )
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+    is_visible = models.BooleanField(
+        'Видна в ленте',
+        default=False,
+        editable=False,
+        help_text='Публикация и её категория опубликованы.'
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def compute_is_visible(self):
+        if not self.is_published or self.category_id is None:
+            return False
+        if Post.category.is_cached(self):
+            return self.category.is_published
+        return Category.objects.filter(
+            pk=self.category_id, is_published=True
+        ).exists()
+
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        self.is_visible = self.compute_is_visible()
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None and not self._state.adding
+                and self.pk is not None
+                and not args and not kwargs.get('force_insert')):
+            # comment_count меняют атомарные F() в сигналах комментариев:
+            # полное сохранение вернуло бы в строку устаревшее значение.
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'comment_count'
+                and field.attname not in deferred
+            ]
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at'}
+            if 'text' in update_fields:
+                update_fields.add('excerpt')
+            if update_fields & {'is_published', 'category'}:
+                update_fields.add('is_visible')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -123,6 +220,12 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
@@ -0,0 +1,143 @@
+import base64
+import json
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import get_cached_count
+
+
+# Первичные ключи курсора должны помещаться в BIGINT базы.
+MAX_CURSOR_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт число объектов из кэша.
+
+    COUNT(*) выполняется только при промахе кэша; ключ зависит от
+    сигнатуры фильтра и поколения контента, которое сбрасывают сигналы.
+    """
+
+    @cached_property
+    def count(self):
+        return get_cached_count(self.object_list)
+
+
+class CursorPage:
+    """Страница keyset-пагинации по ключу (pub_date, id)."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор без OFFSET и COUNT(*).
+
+    Страница выбирается условием по последней показанной паре
+    (дата, id), поэтому стоимость N-й страницы не зависит от N.
+    """
+
+    def __init__(self, queryset, per_page, date_field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.date_field = date_field
+        self.descending = descending
+
+    @staticmethod
+    def encode_cursor(obj, date_field, reverse=False):
+        payload = [getattr(obj, date_field).isoformat(), obj.pk]
+        if reverse:
+            payload.append('r')
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            date = parse_datetime(payload[0])
+            pk = int(payload[1])
+            reverse = payload[2:] == ['r']
+        except (TypeError, ValueError, LookupError, OverflowError):
+            raise InvalidCursor(cursor)
+        if date is None or not -MAX_CURSOR_PK - 1 <= pk <= MAX_CURSOR_PK:
+            raise InvalidCursor(cursor)
+        return date, pk, reverse
+
+    def _ordering(self, reverse):
+        prefix = '-' if self.descending != reverse else ''
+        return f'{prefix}{self.date_field}', f'{prefix}pk'
+
+    def _seek(self, date, pk, reverse):
+        field = self.date_field
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return self.queryset.filter(
+            Q(**{f'{field}__{lookup}': date})
+            | Q(**{field: date, f'pk__{lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        field = self.date_field
+        if not cursor:
+            qs, reverse = self.queryset, False
+        else:
+            date, pk, reverse = self.decode_cursor(cursor)
+            qs = self._seek(date, pk, reverse)
+
+        rows = list(
+            qs.order_by(*self._ordering(reverse))[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, self)
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(self.encode_cursor(rows[-1], field)
+                         if has_next else None),
+            previous_cursor=(self.encode_cursor(rows[0], field, reverse=True)
+                             if has_previous else None),
+        )
@@ -0,0 +1,202 @@
+"""Публикация и подписка внутри процесса для потоков событий.
+
+Подписчики — корутины в цикле событий ASGI, публикуют же обычно
+синхронные обработчики сигналов в других потоках, поэтому доставка идёт
+через loop.call_soon_threadsafe.
+
+Между процессами сообщения передаёт ретранслятор (команда
+run_pubsub_relay), адрес которого задаёт PUBSUB_RELAY: каждый процесс
+отправляет ему свои сообщения и получает чужие. Это простая замена
+pub/sub Redis для одной машины.
+"""
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 1
+
+
+class Subscription:
+    """Очередь сообщений одного подписчика.
+
+    Если подписчик не успевает забирать сообщения, подписка
+    закрывается: клиент переподключится и дочитает пропущенное из базы.
+    """
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, message):
+        """Вызывается в цикле событий подписчика."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Следующее сообщение или None, если подписка переполнилась."""
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Broker:
+    def __init__(self, relay_address=None):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+        self.relay = (RelayConnection(self, relay_address)
+                      if relay_address else None)
+
+    def subscribe(self, channel, maxsize=100):
+        """Подписывает текущую корутину на канал."""
+        subscription = Subscription(self, channel, maxsize)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.channel]
+
+    def has_listeners(self, channel):
+        """Есть ли кому доставлять: подписчики здесь или другие процессы."""
+        return self.relay is not None or channel in self.subscriptions
+
+    def publish(self, channel, message):
+        """Публикует сообщение; можно вызывать из любого потока."""
+        self.deliver(channel, message)
+        if self.relay is not None:
+            self.relay.send(channel, message)
+
+    def deliver(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, message
+                )
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт.
+                self.unsubscribe(subscription)
+
+
+class RelayConnection:
+    """Соединение процесса с ретранслятором.
+
+    Сообщения идут строками JSON. Пока ретранслятор недоступен,
+    сообщения другим процессам теряются: потоки дочитают их из базы
+    при переподключении клиентов.
+    """
+
+    def __init__(self, broker, address):
+        self.broker = broker
+        self.address = parse_address(address)
+        self.socket = None
+        self.lock = threading.Lock()
+        self.connected = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name='pubsub-relay', daemon=True
+        )
+        self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                with socket.create_connection(self.address) as sock:
+                    with self.lock:
+                        self.socket = sock
+                    self.connected.set()
+                    for line in sock.makefile('rb'):
+                        channel, message = json.loads(line)
+                        self.broker.deliver(channel, message)
+            except OSError:
+                logger.warning('Нет связи с ретранслятором %s:%s',
+                               *self.address)
+            except ValueError:
+                logger.exception('Некорректное сообщение ретранслятора')
+            finally:
+                self.connected.clear()
+                with self.lock:
+                    self.socket = None
+            time.sleep(RECONNECT_DELAY)
+
+    def send(self, channel, message):
+        line = json.dumps([channel, message]).encode() + b'\n'
+        with self.lock:
+            if self.socket is None:
+                return
+            try:
+                self.socket.sendall(line)
+            except OSError:
+                logger.warning('Не удалось отправить сообщение '
+                               'ретранслятору')
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host, int(port)
+
+
+async def serve_relay(host, port, started=None):
+    """Ретранслятор: пересылает каждую строку всем остальным клиентам."""
+    clients = set()
+
+    async def handle(reader, writer):
+        clients.add(writer)
+        try:
+            async for line in reader:
+                for client in list(clients):
+                    if client is not writer:
+                        client.write(line)
+        except ConnectionError:
+            pass
+        finally:
+            clients.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if started is not None:
+        started(server)
+    async with server:
+        await server.serve_forever()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = Broker(settings.PUBSUB_RELAY)
+        return _broker
@@ -0,0 +1,98 @@
+"""Учёт SQL-запросов запроса и поиск N+1.
+
+Запросы перехватываются обёрткой из connection.execute_wrappers,
+поэтому учёт работает и при DEBUG = False. Активные отчёты хранятся
+в ContextVar: так учитываются и запросы из потоков sync_to_async,
+в которых асинхронные представления читают данные.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+# Списки IN (%s, %s, ...) разной длины — один и тот же запрос.
+PARAMS_LIST_RE = re.compile(r'\((?:%s|\?)(?:\s*,\s*(?:%s|\?))*\)')
+
+
+def get_query_shape(sql):
+    return PARAMS_LIST_RE.sub('(...)', sql)
+
+
+class QueryReport:
+    def __init__(self, view_name=None):
+        self.view_name = view_name
+        self.queries = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.duration += elapsed
+            self.queries.append((sql, elapsed))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def get_repeated_shapes(self, threshold=None):
+        """Формы запросов, повторённые не меньше threshold раз."""
+        if threshold is None:
+            threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD
+        shapes = Counter(get_query_shape(sql) for sql, _ in self.queries)
+        return {
+            shape: repeats for shape, repeats in shapes.items()
+            if repeats >= threshold
+        }
+
+    def get_problems(self, budget=None, threshold=None):
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(
+                f'{self.view_name or "запрос"}: {self.count} SQL-запросов'
+                f' при бюджете {budget}'
+                f' ({self.duration * 1000:.1f} мс)'
+            )
+        for shape, repeats in self.get_repeated_shapes(threshold).items():
+            problems.append(f'N+1: {repeats} раз {shape}')
+        return problems
+
+
+active_reports = ContextVar('active_reports', default=())
+
+
+def report_query(execute, sql, params, many, context):
+    for report in active_reports.get():
+        execute = partial(report, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_reporting(connection):
+    if report_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(report_query)
+
+
+@contextmanager
+def record_queries(view_name=None):
+    report = QueryReport(view_name)
+    # Соединения других потоков подключаются в сигнале connection_created.
+    for connection in connections.all():
+        install_query_reporting(connection)
+    token = active_reports.set(active_reports.get() + (report,))
+    try:
+        yield report
+    finally:
+        active_reports.reset(token)
+
+
+def get_query_budget(view_name):
+    return settings.QUERY_BUDGETS.get(
+        view_name, settings.QUERY_BUDGET_DEFAULT
+    )
@@ -0,0 +1,108 @@
+"""Категории и местоположения в памяти процесса.
+
+Таблицы маленькие и меняются редко, а нужны почти каждому запросу:
+странице и ленте категории, форме публикации, API. Процесс загружает
+их целиком и перечитывает, только когда сдвигается поколение реестра
+в REGISTRY_CACHE. Его сдвигают сигналы сохранения и удаления категорий
+и местоположений в любом процессе, поэтому при общем кэше изменения
+видны всем процессам, а проверка стоит одного чтения кэша.
+
+Объекты реестра общие для всех запросов процесса: их нельзя менять.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+
+from .cache import new_version
+from .models import Category, Location
+from .routers import use_primary
+
+REGISTRY_GENERATION_KEY = 'blog:registry_generation'
+
+
+def get_registry_cache():
+    return caches[settings.REGISTRY_CACHE]
+
+
+def bump_registry_generation():
+    get_registry_cache().set(REGISTRY_GENERATION_KEY, new_version(), None)
+
+
+def get_registry_generation():
+    cache = get_registry_cache()
+    generation = cache.get(REGISTRY_GENERATION_KEY)
+    if generation is None:
+        generation = new_version()
+        cache.set(REGISTRY_GENERATION_KEY, generation, None)
+    return generation
+
+
+class Snapshot:
+    def __init__(self, generation):
+        self.generation = generation
+        # Реплика могла ещё не получить изменение, из-за которого
+        # сдвинулось поколение.
+        with use_primary():
+            self.categories = list(Category.objects.order_by('pk'))
+            self.locations = list(Location.objects.order_by('pk'))
+        self.categories_by_id = {
+            category.pk: category for category in self.categories
+        }
+        self.categories_by_slug = {
+            category.slug: category for category in self.categories
+        }
+        self.locations_by_id = {
+            location.pk: location for location in self.locations
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def get_snapshot(self):
+        generation = get_registry_generation()
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.generation != generation:
+            with self.lock:
+                snapshot = self.snapshot
+                if snapshot is None or snapshot.generation != generation:
+                    snapshot = self.snapshot = Snapshot(generation)
+        return snapshot
+
+    def clear(self):
+        self.snapshot = None
+
+
+registry = Registry()
+
+
+def get_categories():
+    return registry.get_snapshot().categories
+
+
+def get_locations():
+    return registry.get_snapshot().locations
+
+
+def get_category(pk):
+    return registry.get_snapshot().categories_by_id.get(pk)
+
+
+def get_location(pk):
+    return registry.get_snapshot().locations_by_id.get(pk)
+
+
+def get_published_category_or_404(slug):
+    category = registry.get_snapshot().categories_by_slug.get(slug)
+    if category is None or not category.is_published:
+        raise Http404('Категория не найдена.')
+    return category
+
+
+def invalidate_registry():
+    registry.clear()
+    bump_registry_generation()
@@ -0,0 +1,48 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_primary = ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Направляет все чтения внутри блока в основную базу."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def get_replicas():
+    return settings.DATABASE_REPLICAS
+
+
+def reads_from_replica():
+    return bool(get_replicas()) and not _use_primary.get()
+
+
+class PrimaryReplicaRouter:
+    """Чтения — в случайную реплику, запись — в основную базу.
+
+    Чтение остаётся в основной базе внутри use_primary() и внутри
+    транзакции: там запрос должен видеть только что записанное.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (not reads_from_replica()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(get_replicas())
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        return {obj1._state.db, obj2._state.db} <= databases or None
@@ -0,0 +1,67 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import bump_content_generation, get_next_pub_date, get_page_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+CHECKED_AT_KEY = 'blog:publication_checked_at'
+
+
+class PublicationScheduler:
+    """Меняет поколение контента, когда наступает время отложенных
+    публикаций.
+
+    Пока планировщик работает, кэши страниц и счётчиков можно держать
+    между событиями публикации, не сверяясь с pub_date на каждом запросе.
+    Процессы должны видеть один кэш: в отдельном процессе (команда
+    run_publication_scheduler) нужен общий бэкенд, например файловый.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or settings.PUBLICATION_SCHEDULER_INTERVAL
+        self.stop_event = threading.Event()
+
+    def tick(self, now=None):
+        """Проверяет, стали ли видны новые публикации.
+
+        Возвращает число секунд до следующей проверки.
+        """
+        now = now or timezone.now()
+        cache = get_page_cache()
+        checked_at = cache.get(CHECKED_AT_KEY)
+        if checked_at is None or Post.objects.filter(
+            is_visible=True, pub_date__gt=checked_at, pub_date__lte=now
+        ).exists():
+            bump_content_generation()
+            logger.info('Опубликованы отложенные посты, кэш сброшен')
+        cache.set(CHECKED_AT_KEY, now, None)
+
+        next_pub_date = get_next_pub_date(now)
+        if next_pub_date is None:
+            return self.interval
+        return max(0, min(self.interval,
+                          (next_pub_date - now).total_seconds()))
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                delay = self.tick()
+            except Exception:
+                logger.exception('Ошибка планировщика публикаций')
+                delay = self.interval
+            self.stop_event.wait(delay)
+
+    def start(self):
+        thread = threading.Thread(
+            target=self.run, name='publication-scheduler', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,157 @@
+"""Полнотекстовый поиск по публикациям и комментариям (SQLite FTS5).
+
+Индекс blog_search создаётся миграцией 0011. Публикация хранится в нём
+под rowid = 2 * id, комментарий — под 2 * id + 1, поэтому обновление
+и удаление записи не требуют поиска по неиндексируемому post_id.
+Видимость публикаций проверяется при поиске, а не при индексации:
+снятие с публикации и отложенные посты не требуют переиндексации.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Post
+
+SEARCH_TABLE = 'blog_search'
+INSERT_SQL = (
+    f'INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, body, post_id) '
+    'VALUES (%s, %s, %s, %s)'
+)
+DELETE_SQL = f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s'
+TERM_RE = re.compile(r'\w+')
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def post_row(post):
+    return post.pk * 2, post.title, post.text, post.pk
+
+
+def comment_row(comment):
+    return comment.pk * 2 + 1, '', comment.text, comment.post_id
+
+
+def index_rows(rows):
+    with connection.cursor() as cursor:
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def unindex_rowid(rowid):
+    with connection.cursor() as cursor:
+        cursor.execute(DELETE_SQL, [rowid])
+
+
+def index_post(post):
+    index_rows([post_row(post)])
+
+
+def unindex_post(post):
+    unindex_rowid(post.pk * 2)
+
+
+def index_comment(comment):
+    index_rows([comment_row(comment)])
+
+
+def unindex_comment(comment):
+    unindex_rowid(comment.pk * 2 + 1)
+
+
+def rebuild_search_index(batch_size=1000):
+    """Заново индексирует все публикации и комментарии пакетами.
+
+    Возвращает число проиндексированных записей.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    indexed = 0
+    for model, fields, make_row in (
+        (Post, ('pk', 'title', 'text'), post_row),
+        (Comment, ('pk', 'text', 'post_id'), comment_row),
+    ):
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by('pk').only(*fields)[:batch_size]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                index_rows([make_row(obj) for obj in batch])
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('optimize')"
+        )
+    return indexed
+
+
+def build_match_query(text):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс: «публикац» найдёт «публикации».
+    Синтаксис FTS5 (кавычки, NEAR, OR) из ввода не пропускается.
+    """
+    return ' '.join(f'"{term}"*' for term in TERM_RE.findall(text.lower()))
+
+
+class SearchResults:
+    """Опубликованные публикации, найденные по запросу, по убыванию
+    релевантности.
+
+    Ленивый список для Paginator: считает и выбирает только запрошенный
+    срез, а публикации догружает одним запросом по первичному ключу.
+    """
+
+    def __init__(self, text):
+        self.match = build_match_query(text) if search_available() else ''
+        # Те же правила видимости, что и в ленте; проверяются для каждого
+        # совпадения по первичному ключу, без выборки всех публикаций.
+        visible = Post.objects.published().filter(
+            pk=RawSQL(f'{SEARCH_TABLE}.post_id', ())
+        ).values('pk')
+        sql, params = visible.query.sql_with_params()
+        self.where = f'{SEARCH_TABLE} MATCH %s AND EXISTS ({sql})'
+        self.params = [self.match, *params]
+        self._count = None
+
+    def count(self):
+        if not self.match:
+            return 0
+        if self._count is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT COUNT(DISTINCT post_id) FROM {SEARCH_TABLE} '
+                    f'WHERE {self.where}',
+                    self.params
+                )
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        if not self.match or index.stop is not None and index.stop <= start:
+            return []
+        limit = -1 if index.stop is None else index.stop - start
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id, MIN(rank) AS score FROM {SEARCH_TABLE} '
+                f'WHERE {self.where} GROUP BY post_id '
+                'ORDER BY score, post_id LIMIT %s OFFSET %s',
+                [*self.params, limit, start]
+            )
+            scores = dict(cursor.fetchall())
+        posts = Post.objects.select_related(
+            'category', 'location', 'author'
+        ).defer('text').in_bulk(scores)
+        return [posts[pk] for pk in scores if pk in posts]
@@ -0,0 +1,188 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .auth import invalidate_cached_user
+from .cache import (bump_content_generation, bump_global_card_version,
+                    bump_post_card_versions)
+from .db import apply_sqlite_pragmas
+from .models import Category, Comment, Location, Post, make_excerpt
+from .querybudget import install_query_reporting
+from .registry import bump_registry_generation, invalidate_registry
+from .search import (index_comment, index_post, search_available,
+                     unindex_comment, unindex_post)
+from .sse import publish_comment
+from .thumbnails import generate_renditions
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        apply_sqlite_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
+
+
+@receiver(connection_created)
+def report_connection_queries(sender, connection, **kwargs):
+    install_query_reporting(connection)
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, **kwargs):
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_comment(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F('comment_count') - 1, 0),
+        updated_at=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Post)
+def fill_raw_post_updated_at(sender, instance, raw=False, **kwargs):
+    # loaddata не применяет auto_now, а в db.json этого поля нет.
+    if raw and instance.updated_at is None:
+        instance.updated_at = instance.created_at or timezone.now()
+
+
+@receiver(post_save, sender=Post)
+def sync_raw_post_fields(sender, instance, raw=False, **kwargs):
+    # loaddata сохраняет объекты в обход Post.save().
+    if raw:
+        instance.excerpt = make_excerpt(instance.text)
+        instance.is_visible = instance.compute_is_visible()
+        Post.objects.filter(pk=instance.pk).update(
+            excerpt=instance.excerpt, is_visible=instance.is_visible
+        )
+
+
+@receiver(post_save, sender=Category)
+def cascade_category_visibility(sender, instance, **kwargs):
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.filter(is_published=True, is_visible=False).update(
+            is_visible=True, updated_at=timezone.now()
+        )
+    else:
+        posts.filter(is_visible=True).update(
+            is_visible=False, updated_at=timezone.now()
+        )
+
+
+@receiver(pre_delete, sender=Category)
+def hide_orphaned_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(
+        is_visible=False, updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_index(sender, instance, update_fields=None,
+                             **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    if search_available():
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search_index(sender, instance, **kwargs):
+    if search_available():
+        unindex_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_search_index(sender, instance, **kwargs):
+    if search_available():
+        index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_search_index(sender, instance, **kwargs):
+    if search_available():
+        unindex_comment(instance)
+
+
+@receiver(post_save, sender=Post)
+def create_image_renditions(sender, instance, raw=False, **kwargs):
+    if not instance.image or raw:
+        return
+    try:
+        generate_renditions(instance.image.name, instance.image.storage)
+    except OSError:
+        # Битое изображение не должно мешать сохранить публикацию:
+        # карточка покажет оригинал.
+        logger.warning('Не удалось создать превью для %s',
+                       instance.image.name, exc_info=True)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, **kwargs):
+    bump_post_card_versions(instance.pk)
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post_card(sender, instance, **kwargs):
+    bump_post_card_versions(instance.post_id)
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_post_cards(sender, **kwargs):
+    bump_global_card_version()
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_category_registry(sender, **kwargs):
+    invalidate_registry()
+    # Другой процесс мог перечитать реестр до фиксации транзакции.
+    transaction.on_commit(bump_registry_generation)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_post_cards(sender, instance, created,
+                                 update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login — карточки
+    # от этого не меняются.
+    if created or (update_fields and 'username' not in update_fields):
+        return
+    bump_post_card_versions(*instance.posts.values_list('pk', flat=True))
+    bump_content_generation()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
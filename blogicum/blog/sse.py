@@ -0,0 +1,235 @@
+"""Поток новых комментариев публикации (server-sent events).
+
+Под ASGI поток обслуживает CommentStreamRouter: соединение держится
+открытым, а новые комментарии приходят из брокера pubsub. Django 3.2
+читает потоковые ответы синхронно прямо в цикле событий, поэтому поток
+отдаётся в обход обработчика Django.
+
+Страница публикации подключается к потоку только при COMMENT_STREAM.
+Если запрос к потоку всё же пришёл в WSGI, его обслуживает
+CommentStreamView: отдаёт пропущенные комментарии и закрывает
+соединение, а EventSource переподключается через
+COMMENT_STREAM_POLL_INTERVAL секунд.
+"""
+import asyncio
+from datetime import datetime, timezone as dt_timezone
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http import Http404, HttpRequest, HttpResponse, QueryDict
+from django.http.cookie import parse_cookie
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+from django.views import generic
+
+from .async_views import run_sync
+from .models import Post
+from .pubsub import get_broker
+from .routers import use_primary
+
+STREAM_URL_NAME = 'blog:comment_stream'
+STREAM_PATH_SUFFIX = '/comments/stream/'
+# Сколько пропущенных комментариев отдавать при переподключении.
+MAX_REPLAY = 100
+
+
+def get_channel(post_id):
+    return f'post:{post_id}:comments'
+
+
+def render_comment(comment):
+    """Разметка комментария, как в списке на странице публикации.
+
+    Отрисовывается один раз для всех читателей, поэтому без ссылок
+    правки, которые видит только автор.
+    """
+    return render_to_string('includes/comment.html', {'comment': comment})
+
+
+def publish_comment(comment):
+    channel = get_channel(comment.post_id)
+    broker = get_broker()
+    if broker.has_listeners(channel):
+        broker.publish(channel, {
+            'id': comment.pk, 'html': render_comment(comment),
+        })
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def format_comment(message):
+    return format_event(message['html'], 'comment', message['id'])
+
+
+def format_retry(seconds):
+    return f'retry: {int(seconds * 1000)}\n\n'.encode()
+
+
+def get_missed_comments(post, last_event_id=None, after=None):
+    """Комментарии после Last-Event-ID или, при первом подключении,
+    созданные после отрисовки страницы (after — время в секундах).
+    """
+    comments = post.comments.select_related('author')
+    if last_event_id and last_event_id.isdigit():
+        comments = comments.filter(pk__gt=int(last_event_id))
+    elif after:
+        try:
+            since = datetime.fromtimestamp(float(after), dt_timezone.utc)
+        except (ValueError, OverflowError):
+            return []
+        comments = comments.filter(created_at__gt=since)
+    else:
+        return []
+    return [
+        {'id': comment.pk, 'html': render_comment(comment)}
+        for comment in comments.order_by('pk')[:MAX_REPLAY]
+    ]
+
+
+def get_stream_post(post_id, user):
+    try:
+        return Post.objects.visible_to(user).get(pk=post_id)
+    except Post.DoesNotExist:
+        raise Http404('Публикация не найдена.')
+
+
+def open_stream(scope, post_id):
+    """Проверяет доступ и читает пропущенные комментарии.
+
+    Выполняется в потоке: нужны сессия и база.
+    """
+    headers = {
+        name.decode('latin1'): value.decode('latin1')
+        for name, value in scope['headers']
+    }
+    request = HttpRequest()
+    request.COOKIES = parse_cookie(headers.get('cookie', ''))
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    query = QueryDict(scope.get('query_string', b''))
+    # Только что созданные комментарии могли ещё не дойти до реплики.
+    with use_primary():
+        post = get_stream_post(post_id, get_user(request))
+        return get_missed_comments(
+            post, headers.get('last-event-id'), query.get('after')
+        )
+
+
+class CommentStreamView(generic.View):
+    """Поток без ASGI: пропущенные комментарии и переподключение."""
+
+    def get(self, request, post_id):
+        with use_primary():
+            post = get_stream_post(post_id, request.user)
+            missed = get_missed_comments(
+                post, request.headers.get('Last-Event-ID'),
+                request.GET.get('after')
+            )
+        response = HttpResponse(
+            format_retry(settings.COMMENT_STREAM_POLL_INTERVAL)
+            + b''.join(map(format_comment, missed)),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_comments(scope, receive, send, post_id):
+    broker = get_broker()
+    # Подписка до чтения пропущенного: иначе между ними можно
+    # потерять комментарий. Повторы отсекаются по id.
+    with broker.subscribe(get_channel(post_id)) as subscription:
+        try:
+            missed = await run_sync(open_stream, scope, post_id)
+        except Http404:
+            await send({
+                'type': 'http.response.start', 'status': 404,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+            })
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await send({
+            'type': 'http.response.start', 'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        last_id = 0
+        chunk = format_retry(settings.COMMENT_STREAM_RETRY)
+        for message in missed:
+            chunk += format_comment(message)
+            last_id = message['id']
+        await send({
+            'type': 'http.response.body', 'body': chunk, 'more_body': True,
+        })
+
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            while True:
+                message = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    {message, disconnected},
+                    timeout=settings.COMMENT_STREAM_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnected in done:
+                    message.cancel()
+                    return
+                if message not in done:
+                    message.cancel()
+                    chunk = b': keepalive\n\n'
+                elif message.result() is None:
+                    # Подписка переполнилась: клиент переподключится
+                    # и дочитает пропущенное по Last-Event-ID.
+                    break
+                elif message.result()['id'] <= last_id:
+                    continue
+                else:
+                    last_id = message.result()['id']
+                    chunk = format_comment(message.result())
+                await send({
+                    'type': 'http.response.body', 'body': chunk,
+                    'more_body': True,
+                })
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+
+
+class CommentStreamRouter:
+    """ASGI-приложение: поток комментариев отдаёт само, остальные
+    запросы передаёт Django.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] == 'http' and scope['method'] == 'GET'
+                and scope['path'].endswith(STREAM_PATH_SUFFIX)):
+            try:
+                match = resolve(scope['path'])
+            except Resolver404:
+                match = None
+            if match is not None and match.view_name == STREAM_URL_NAME:
+                return await stream_comments(
+                    scope, receive, send, **match.kwargs
+                )
+        return await self.application(scope, receive, send)
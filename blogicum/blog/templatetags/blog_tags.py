@@ -0,0 +1,25 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_post_cards
+from blog.thumbnails import get_rendition_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    return [mark_safe(card) for card in render_post_cards(posts)]
+
+
+@register.simple_tag
+def elided_page_range(page):
+    """Номера страниц вокруг текущей с многоточиями для любого Page."""
+    return page.paginator.get_elided_page_range(
+        page.number, on_each_side=2, on_ends=1
+    )
+
+
+@register.simple_tag
+def image_rendition(image, rendition='card'):
+    return get_rendition_url(image, rendition)
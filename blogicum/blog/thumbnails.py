@@ -0,0 +1,64 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def get_rendition_format():
+    image_format = settings.POST_IMAGE_RENDITION_FORMAT
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def rendition_name(name, rendition):
+    """posts_image/cat.png -> posts_image/cat.card.webp"""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{rendition}.{EXTENSIONS[get_rendition_format()]}'
+
+
+def make_rendition(original, size, image_format):
+    image = ImageOps.exif_transpose(original)
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=80, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_renditions(name, storage=default_storage, force=False):
+    """Создаёт уменьшенные копии изображения рядом с оригиналом.
+
+    Возвращает число созданных файлов.
+    """
+    image_format = get_rendition_format()
+    missing = {
+        rendition: size
+        for rendition, size in settings.POST_IMAGE_RENDITIONS.items()
+        if force or not storage.exists(rendition_name(name, rendition))
+    }
+    if not missing:
+        return 0
+    with storage.open(name) as file, Image.open(file) as original:
+        original.load()
+        for rendition, size in missing.items():
+            target = rendition_name(name, rendition)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, make_rendition(original, size, image_format))
+    return len(missing)
+
+
+def get_rendition_url(image, rendition):
+    if not image:
+        return ''
+    name = rendition_name(image.name, rendition)
+    if image.storage.exists(name):
+        return image.storage.url(name)
+    return image.url
@@ -1,19 +1,38 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, feeds, sse, views
 
 app_name = 'blog'
 
+# Лента, публикация, категория и профиль: варианты для ASGI или WSGI.
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path(
         '',
-        views.PostListView.as_view(),
+        read_views.PostListView.as_view(),
         name='index'
     ),
+    path(
+        'feed/<str:feed_format>/',
+        feeds.LatestPostsFeed.as_view(),
+        name='feed'
+    ),
     path(
         'posts/<int:post_id>/',
-        views.PostDetailView.as_view(),
+        read_views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
+    path(
+        'posts/<int:post_id>/comments/stream/',
+        sse.CommentStreamView.as_view(),
+        name='comment_stream'
+    ),
     path(
         'posts/<int:post_id>/edit/',
         views.PostEditView.as_view(),
@@ -40,9 +59,19 @@ urlpatterns = [
         name='delete_comment'),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostListView.as_view(),
+        read_views.CategoryPostListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/<str:feed_format>/',
+        feeds.CategoryPostsFeed.as_view(),
+        name='category_feed'
+    ),
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name='search'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -55,7 +84,12 @@ urlpatterns = [
     ),
     path(
         'profile/<str:username>/',
-        views.ProfileDetailView.as_view(),
+        read_views.ProfileDetailView.as_view(),
         name='profile'
-    )
+    ),
+    path(
+        'profile/<str:username>/feed/<str:feed_format>/',
+        feeds.AuthorPostsFeed.as_view(),
+        name='profile_feed'
+    ),
 ]
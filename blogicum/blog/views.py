@@ -1,77 +1,228 @@
+import hashlib
+
 from django.views.generic import (ListView, DetailView, CreateView,
                                   UpdateView, DeleteView)
-from django.shortcuts import get_object_or_404, redirect
-from .models import Post, Category, Comment
-from django.utils import timezone
+from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, JsonResponse
+from .models import Post, Comment
 from django.conf import settings
 from .forms import PostCreateForm, CommentForm
 from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.core.paginator import PageNotAnInteger, EmptyPage
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.views import generic
-from django.db.models import Count
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from .cache import (get_content_generation, get_last_modified,
+                    get_page_cache, get_page_cache_key,
+                    get_page_cache_timeout, get_site_last_modified)
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .registry import get_published_category_or_404
+from .search import SearchResults
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя запросы страницы.
+
+    ETag строится из поколения контента, поэтому меняется при любой
+    правке публикаций, категорий, мест и комментариев. Last-Modified
+    берётся из get_last_modified_posts() и тоже входит в ETag: без
+    планировщика появление отложенной публикации поколение не меняет.
+    """
+
+    def get_last_modified_posts(self):
+        return None
+
+    def get_last_modified(self):
+        posts = self.get_last_modified_posts()
+        return get_last_modified(posts) if posts is not None else None
+
+    def get_etag(self):
+        request = self.request
+        parts = (
+            get_content_generation(),
+            self.last_modified,
+            request.user.pk,
+            request.get_full_path(),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        )
+        return quote_etag(
+            hashlib.md5(repr(parts).encode()).hexdigest()
+        )
+
+    def get_not_modified_response(self):
+        """Вычисляет валидаторы; возвращает 304, если страница не
+        изменилась, иначе None.
+        """
+        last_modified = self.get_last_modified()
+        # Заголовки HTTP хранят время с точностью до секунды.
+        self.last_modified = (int(last_modified.timestamp())
+                              if last_modified is not None else None)
+        self.etag = self.get_etag()
+        return get_conditional_response(
+            self.request, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def set_validators(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        response = self.get_not_modified_response()
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.set_validators(response)
+
+
+class AnonymousPageCacheMixin:
+    page_cache_params = ('page', 'cursor')
+
+    def use_page_cache(self):
+        return (self.request.method == 'GET'
+                and not self.request.user.is_authenticated)
+
+    def get_cached_page(self):
+        self.page_cache_key = get_page_cache_key(
+            self.request, self.page_cache_params
+        )
+        return get_page_cache().get(self.page_cache_key)
+
+    def cache_page(self, response):
+        """Сохраняет страницу в кэш, когда она будет отрисована."""
+        if response.status_code == 200 and hasattr(response, 'render'):
+            cache, key = get_page_cache(), self.page_cache_key
+            response.add_post_render_callback(
+                lambda rendered: self.store_page(cache, key, rendered)
+            )
+        return response
 
-class PostListView(ListView):
+    def dispatch(self, request, *args, **kwargs):
+        if not self.use_page_cache():
+            return super().dispatch(request, *args, **kwargs)
+        response = self.get_cached_page()
+        if response is not None:
+            return response
+        return self.cache_page(super().dispatch(request, *args, **kwargs))
+
+    @staticmethod
+    def store_page(cache, key, response):
+        timeout = get_page_cache_timeout()
+        if timeout > 0 and not response.cookies:
+            cache.set(key, response, timeout)
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+
+    def use_cursor_pagination(self):
+        return settings.POSTS_CURSOR_PAGINATION
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор пагинации.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PostListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                   CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = settings.POSTS_PER_PAGE
+    paginator_class = CachedCountPaginator
+
+    def get_last_modified(self):
+        return get_site_last_modified()
 
     def get_queryset(self):
-        qs = Post.objects.select_related(
-            'category', 'location', 'author'
-        ).annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
-        return filter_published_posts(qs)
+        return get_post_list(filter_published_posts())
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                     DetailView):
     model = Post
     template_name = 'blog/detail.html'
+    page_cache_params = ('comments_cursor',)
+
+    def get_last_modified_posts(self):
+        return Post.objects.visible_to(self.request.user).filter(
+            pk=self.kwargs['post_id']
+        )
 
     def get_object(self, queryset=None):
         qs = Post.objects.select_related(
             'category', 'location', 'author'
-        )
-        pk = self.kwargs['post_id']
-
-        if self.request.user.is_authenticated:
-            post = get_object_or_404(qs, pk=pk)
-            if post.author == self.request.user:
-                return post
-        qs = filter_published_posts(qs)
-        return get_object_or_404(qs, pk=pk)
+        ).visible_to(self.request.user)
+        return get_object_or_404(qs, pk=self.kwargs['post_id'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        post = self.object
-        context['comments'] = post.comments.select_related('author').all()
+        context['comments'] = self.get_comments_page()
+        context['comment_stream'] = settings.COMMENT_STREAM
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
 
+    def get_comments_page(self):
+        return get_comments_page(
+            self.object, self.request.GET.get('comments_cursor')
+        )
+
 
-class CategoryPostListView(ListView):
+class PostCommentsView(generic.View):
+    def get(self, request, post_id):
+        post = get_object_or_404(
+            Post.objects.visible_to(request.user), pk=post_id
+        )
+        comments = get_comments_page(post, request.GET.get('cursor'))
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [
+                    {
+                        'id': comment.pk,
+                        'author': comment.author.username,
+                        'text': comment.text,
+                        'created_at': comment.created_at.isoformat(),
+                    }
+                    for comment in comments
+                ],
+                'next_cursor': comments.next_cursor,
+            })
+        return render(request, 'includes/comment_list.html', {
+            'post': post,
+            'comments': comments,
+        })
+
+
+class CategoryPostListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                           CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = settings.POSTS_PER_PAGE
+    paginator_class = CachedCountPaginator
+
+    def get_last_modified_posts(self):
+        return filter_published_posts().filter(
+            category__slug=self.kwargs['category_slug']
+        )
 
     def get_queryset(self):
-        category_slug = self.kwargs['category_slug']
-        self.category = get_object_or_404(
-            Category,
-            slug=category_slug,
-            is_published=True
+        self.category = get_published_category_or_404(
+            self.kwargs['category_slug']
         )
-        qs = self.category.posts.select_related(
-            'category', 'location', 'author'
-        ).annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
-        return filter_published_posts(qs)
+        return get_post_list(filter_published_posts(self.category.posts))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -79,6 +230,24 @@ class CategoryPostListView(ListView):
         return context
 
 
+class SearchView(ListView):
+    template_name = 'blog/search.html'
+    paginate_by = settings.POSTS_PER_PAGE
+    max_query_length = 200
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()[
+            :self.max_query_length
+        ]
+        return SearchResults(self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['pagination_query'] = urlencode({'q': self.query}) + '&'
+        return context
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostCreateForm
@@ -145,36 +314,35 @@ class RegisterView(CreateView):
     success_url = reverse_lazy('blog:index')
 
 
-class ProfileDetailView(DetailView):
+class ProfileDetailView(ConditionalGetMixin, DetailView):
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
     slug_field = 'username'
     slug_url_kwarg = 'username'
 
+    def get_last_modified_posts(self):
+        return Post.objects.visible_to(self.request.user).filter(
+            author__username=self.kwargs['username']
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object()
-
-        if self.request.user == user:
-            posts = user.posts.select_related('category')
-        else:
-            posts = user.posts.filter(
-                is_published=True,
-                pub_date__lte=timezone.now(),
-                category__is_published=True
-            ).select_related('category')
-
-        posts = (posts.order_by('-pub_date')
-                 .annotate(comment_count=Count('comments')))
-
-        context['page_obj'] = get_paginated_page(
-            self.request, posts, settings.POSTS_PER_PAGE
-        )
-        context['is_owner'] = (self.request.user.is_authenticated
-                               and self.request.user == user)
+        user = self.object
+        is_owner = (self.request.user.is_authenticated
+                    and self.request.user == user)
+
+        context['page_obj'] = self.get_posts_page()
+        context['is_owner'] = is_owner
         return context
 
+    def get_posts_page(self):
+        return get_paginated_page(
+            self.request,
+            get_post_list(self.object.posts.visible_to(self.request.user)),
+            settings.POSTS_PER_PAGE
+        )
+
 
 class EditProfileView(LoginRequiredMixin, UpdateView):
     model = User
@@ -200,7 +368,10 @@ class CommentCreateView(
     template_name = 'blog/detail.html'
 
     def get_object(self, queryset=None):
-        return get_object_or_404(Post, pk=self.kwargs['post_id'])
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user),
+            pk=self.kwargs['post_id']
+        )
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
@@ -227,7 +398,10 @@ class CommentBase(LoginRequiredMixin):
                        kwargs={'post_id': comment.post.pk}) + '#comments'
 
     def get_queryset(self):
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user,
+            post__in=Post.objects.visible_to(self.request.user)
+        )
 
 
 class CommentUpdateView(CommentBase, UpdateView):
@@ -254,17 +428,33 @@ class CommentDeleteView(CommentBase, DeleteView):
 
 
 def filter_published_posts(queryset=None):
-    if queryset == None:
+    if queryset is None:
         queryset = Post.objects.all()
-    return queryset.filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-        category__is_published=True
+    return queryset.published()
+
+
+def get_post_list(queryset):
+    """Публикации для лент: без текста и в порядке убывания даты."""
+    return queryset.select_related(
+        'category', 'location', 'author'
+    ).defer('text').order_by('-pub_date')
+
+
+def get_comments_page(post, cursor=None):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        date_field='created_at',
+        descending=False
     )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор пагинации.')
 
 
 def get_paginated_page(request, queryset, per_page):
-    paginator = Paginator(queryset, per_page)
+    paginator = CachedCountPaginator(queryset, per_page)
     page = request.GET.get('page')
     try:
         paginated_posts = paginator.page(page)
@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+# Под ASGI публичные страницы обслуживают асинхронные представления.
+os.environ.setdefault('BLOGICUM_ASYNC_VIEWS', '1')
+os.environ.setdefault('BLOGICUM_COMMENT_STREAM', '1')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from blog.sse import CommentStreamRouter  # noqa: E402
+
+# Поток новых комментариев обслуживается в обход обработчика Django.
+application = CommentStreamRouter(django_application)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,7 +46,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.PrimaryStickinessMiddleware',
+    'blog.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'blog.middleware.SessionBackendMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -85,6 +89,31 @@ DATABASES = {
     }
 }
 
+# Псевдонимы реплик из DATABASES только для чтения. Пока список пуст,
+# все запросы идут в default.
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+
+# Допустимое отставание реплик, в секундах: столько клиент читает из
+# основной базы после записи, и не дольше кэшируются данные из реплик
+# сразу после изменения.
+REPLICA_LAG_SECONDS = 10
+
+REPLICA_STICKY_COOKIE = 'use_primary'
+
+# Выполняются на каждом новом соединении с SQLite. WAL позволяет читать
+# во время записи, busy_timeout (мс) — ждать блокировку вместо ошибки
+# «database is locked». Отрицательный cache_size задаётся в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -142,3 +171,120 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:index'
+
+POSTS_CURSOR_PAGINATION = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Для общего кэша между процессами можно указать FileBasedCache
+    # или любой совместимый с Redis бэкенд.
+    'post_cards': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-cards',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Сессии и пользователи. При нескольких процессах нужен общий для
+    # них кэш: иначе выход или смена пароля в одном процессе не видны
+    # в других до USER_CACHE_TIMEOUT.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Сессии читаются из кэша, в базу пишутся только при изменении.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Сессии, созданные до кэша пользователей, переводит на этот бэкенд
+# blog.middleware.SessionBackendMiddleware.
+AUTHENTICATION_BACKENDS = ['blog.auth.CachedModelBackend']
+
+USER_CACHE = 'sessions'
+
+USER_CACHE_TIMEOUT = 60 * 5
+
+# Кэш с поколением реестра категорий и местоположений (blog.registry).
+# При нескольких процессах нужен общий кэш, иначе изменения в одном
+# процессе не видны в других.
+REGISTRY_CACHE = 'default'
+
+POST_CARD_CACHE = 'post_cards'
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+PAGE_CACHE = 'default'
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+COMMENTS_PER_PAGE = 50
+
+PAGINATOR_COUNT_TIMEOUT = 60 * 10
+
+POST_IMAGE_RENDITIONS = {
+    'card': (640, 640),
+}
+
+POST_IMAGE_RENDITION_FORMAT = 'WEBP'
+
+POST_EXCERPT_WORDS = 10
+
+# Включайте, только если запущен планировщик публикаций: в потоке
+# процесса (PUBLICATION_SCHEDULER_THREAD) или командой
+# run_publication_scheduler при общем для процессов PAGE_CACHE.
+PUBLICATION_SCHEDULER = False
+
+PUBLICATION_SCHEDULER_THREAD = False
+
+PUBLICATION_SCHEDULER_INTERVAL = 60
+
+API_MAX_PAGE_SIZE = 100
+
+FEED_POSTS = 20
+
+# Учёт SQL-запросов по представлениям (blog.middleware.QueryBudgetMiddleware).
+QUERY_BUDGET_ENABLED = DEBUG
+
+QUERY_BUDGETS = {
+    'blog:index': 8,
+    'blog:category_posts': 8,
+    'blog:post_detail': 8,
+    'blog:profile': 8,
+    'blog:search': 8,
+}
+
+# Бюджет представлений, которых нет в QUERY_BUDGETS; None — без бюджета.
+QUERY_BUDGET_DEFAULT = None
+
+# Сколько одинаковых по форме запросов за один запрос считать N+1.
+QUERY_N_PLUS_ONE_THRESHOLD = 5
+
+# Рост p95 в процентах, который benchmark_urls --compare считает регрессией.
+BENCHMARK_TOLERANCE = 20
+
+# Публичные страницы обслуживают асинхронные представления из
+# blog.async_views; blogicum/asgi.py включает их по умолчанию.
+ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+
+# Адрес ретранслятора (run_pubsub_relay), через который процессы
+# обмениваются событиями, например '127.0.0.1:8765'. None — только
+# внутри процесса.
+PUBSUB_RELAY = None
+
+# Страница публикации подключается к потоку новых комментариев, только
+# если его держит открытым CommentStreamRouter (blogicum/asgi.py
+# включает его по умолчанию). Под WSGI поток закрывается после ответа,
+# и каждая вкладка опрашивала бы сервер.
+COMMENT_STREAM = os.environ.get('BLOGICUM_COMMENT_STREAM') == '1'
+
+# Поток новых комментариев (blog.sse): интервал пустых сообщений,
+# задержка переподключения под ASGI и интервал опроса под WSGI, в секундах.
+COMMENT_STREAM_KEEPALIVE = 15
+
+COMMENT_STREAM_RETRY = 3
+
+COMMENT_STREAM_POLL_INTERVAL = 15
@@ -28,6 +28,7 @@ handler500 = 'pages.views.server_error'
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('api/', include('blog.api_urls', namespace='api')),
     path('', include('blog.urls', namespace='blog')),
     path('auth/registration/', RegisterView.as_view(), name='registration'),
     path('auth/password_change/', auth_views.PasswordChangeView.as_view(
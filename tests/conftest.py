@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,13 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +100,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.query_budget",
     "adapters.comment",
 ]
 
@@ -363,6 +372,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
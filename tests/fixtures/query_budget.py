@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+import pytest
+
+from blog.querybudget import get_query_budget, record_queries
+
+
+@pytest.fixture
+def query_budget():
+    """Проверяет число SQL-запросов и отсутствие N+1 внутри блока.
+
+    with query_budget(view='blog:index'):
+        client.get('/')
+
+    Бюджет берётся из QUERY_BUDGETS или передаётся числом.
+    """
+
+    @contextmanager
+    def check(max_queries=None, *, view=None, n_plus_one=None):
+        if max_queries is None and view is not None:
+            max_queries = get_query_budget(view)
+        with record_queries(view) as report:
+            yield report
+        problems = report.get_problems(max_queries, n_plus_one)
+        assert not problems, (
+            'Убедитесь, что страница укладывается в бюджет SQL-запросов:\n'
+            + '\n'.join(problems)
+        )
+
+    return check
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_posts_api_sparse_fields(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/posts/', {'fields': 'id,title'})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data['results']) == 10
+    assert set(data['results'][0]) == {'id', 'title'}
+    post_sql = next(
+        query['sql'] for query in queries
+        if 'FROM "blog_post"' in query['sql']
+    )
+    assert '"blog_post"."text"' not in post_sql, (
+        'Убедитесь, что параметр fields ограничивает выбираемые колонки.'
+    )
+
+    response = client.get('/api/posts/', {'fields': 'password'})
+    assert response.status_code == 400
+
+
+def test_posts_api_cursor_pagination(
+        client, many_posts_with_published_locations
+):
+    first = client.get('/api/posts/').json()
+    second = client.get(
+        '/api/posts/', {'cursor': first['next_cursor']}
+    ).json()
+    ids = [post['id'] for post in first['results'] + second['results']]
+    assert len(set(ids)) == 20
+    assert second['next_cursor'] is None
+
+
+def test_posts_api_etag(client, post_with_published_location):
+    response = client.get('/api/posts/')
+    etag = response['ETag']
+    assert client.get(
+        '/api/posts/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    assert client.get(
+        '/api/posts/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def test_api_respects_visibility(
+        client, user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    assert client.get('/api/posts/').json()['results'] == []
+    assert client.get(f'/api/posts/{post.id}/').status_code == 404
+    assert user_client.get(f'/api/posts/{post.id}/').status_code == 200
+
+
+def test_comments_and_categories_api(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    comments = client.get(f'/api/posts/{post.id}/comments/').json()
+    assert len(comments['results']) == 2
+    categories = client.get('/api/categories/').json()['results']
+    assert [c['slug'] for c in categories] == [post.category.slug]
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import AsyncClient, RequestFactory
+
+from blog import async_views, views
+from blog.querybudget import record_queries
+
+# Асинхронные представления читают из базы в других потоках: им нужны
+# зафиксированные данные, а не незавершённая транзакция теста.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+VIEW_NAMES = (
+    'PostListView', 'PostDetailView', 'CategoryPostListView',
+    'ProfileDetailView',
+)
+
+
+def call(module, view_name, path='/', data=None, user=None, **kwargs):
+    request = RequestFactory().get(path, data or {}, **kwargs.pop(
+        'headers', {}
+    ))
+    request.user = user or AnonymousUser()
+    view = getattr(module, view_name).as_view()
+    if module is async_views:
+        view = async_to_sync(view)
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def page_post_ids(response):
+    context = response.context_data
+    page = context.get('page_obj') or context.get('comments')
+    return [obj.pk for obj in page]
+
+
+@pytest.fixture
+def view_kwargs(many_posts_with_published_locations, mixer):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(3).blend('blog.Comment', post=post, author=post.author)
+    return {
+        'PostListView': {},
+        'PostDetailView': {'post_id': post.pk},
+        'CategoryPostListView': {'category_slug': post.category.slug},
+        'ProfileDetailView': {'username': post.author.username},
+    }
+
+
+@pytest.mark.parametrize('view_name', VIEW_NAMES)
+def test_async_views_are_coroutines(view_name):
+    assert asyncio.iscoroutinefunction(
+        getattr(async_views, view_name).as_view()
+    ), 'Убедитесь, что ASGI вызывает представление в цикле событий.'
+
+
+@pytest.mark.parametrize('view_name', VIEW_NAMES)
+@pytest.mark.parametrize('page', ['1', '2'])
+def test_async_views_match_sync_views(
+        view_kwargs, another_user, view_name, page
+):
+    # Страницы пользователя не кэшируются: оба ответа строятся заново.
+    kwargs = {**view_kwargs[view_name], 'user': another_user}
+    sync_response = call(views, view_name, data={'page': page}, **kwargs)
+    async_response = call(
+        async_views, view_name, data={'page': page}, **kwargs
+    )
+    assert async_response.status_code == sync_response.status_code == 200
+    assert page_post_ids(async_response) == page_post_ids(sync_response), (
+        'Убедитесь, что асинхронное представление показывает те же данные,'
+        ' что и синхронное.'
+    )
+    assert async_response['ETag'] == sync_response['ETag']
+
+
+def test_async_reads_are_recorded_and_not_modified_skips_them(view_kwargs):
+    with record_queries() as report:
+        response = call(async_views, 'PostListView')
+    assert report.count > 0, (
+        'Убедитесь, что учёт запросов видит чтения из потоков пула.'
+    )
+    with record_queries() as report:
+        response = call(
+            async_views, 'PostListView',
+            headers={'HTTP_IF_NONE_MATCH': response['ETag']}
+        )
+    assert response.status_code == 304
+    assert report.count == 0, (
+        'Убедитесь, что ответ 304 не выполняет запросов страницы.'
+    )
+
+
+@pytest.mark.parametrize('view_name, kwargs', [
+    ('PostDetailView', {'post_id': 0}),
+    ('CategoryPostListView', {'category_slug': 'missing'}),
+    ('ProfileDetailView', {'username': 'missing'}),
+])
+def test_async_views_raise_404(view_kwargs, view_name, kwargs):
+    with pytest.raises(Http404):
+        call(async_views, view_name, **kwargs)
+
+
+def test_async_list_rejects_page_out_of_range(view_kwargs):
+    with pytest.raises(Http404):
+        call(async_views, 'PostListView', data={'page': '99'})
+    response = call(async_views, 'PostListView', data={'page': 'last'})
+    assert response.context_data['page_obj'].number == 2
+
+
+def test_async_profile_clamps_page_like_sync(view_kwargs, another_user):
+    kwargs = {**view_kwargs['ProfileDetailView'], 'user': another_user}
+    for page in ('99', 'x'):
+        assert page_post_ids(
+            call(async_views, 'ProfileDetailView', data={'page': page},
+                 **kwargs)
+        ) == page_post_ids(
+            call(views, 'ProfileDetailView', data={'page': page}, **kwargs)
+        )
+
+
+def test_middleware_runs_under_asgi(settings, view_kwargs):
+    settings.QUERY_BUDGET_ENABLED = True
+    response = async_to_sync(AsyncClient().get)('/')
+    assert response.status_code == 200
+    assert int(response['X-DB-Queries']) > 0, (
+        'Убедитесь, что промежуточные слои работают под ASGI.'
+    )
@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_count_is_cached_until_content_changes(
+        mixer, user, published_category, many_posts_with_published_locations
+):
+    posts = Post.objects.published()
+    assert CachedCountPaginator(posts, 10).count == 20
+
+    with CaptureQueriesContext(connection) as queries:
+        assert CachedCountPaginator(Post.objects.published(), 10).count == 20
+    assert not any('COUNT(' in query['sql'] for query in queries), (
+        'Убедитесь, что число публикаций берётся из кэша.'
+    )
+
+    mixer.blend('blog.Post', author=user, category=published_category)
+    assert CachedCountPaginator(Post.objects.published(), 10).count == 21
+
+
+def test_elided_page_range(user_client, mixer, user, published_category):
+    mixer.cycle(120).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    content = user_client.get('/?page=6').content.decode('utf-8')
+    assert '…' in content
+    assert '?page=12' in content
+    assert '?page=3"' not in content
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что счётчик комментариев увеличивается при создании'
+        ' комментария.'
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что счётчик комментариев уменьшается при удалении'
+        ' комментария.'
+    )
+
+
+def test_recount_comments_fixes_drift(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    out = StringIO()
+    call_command('recount_comments', stdout=out)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    assert ': 1' in out.getvalue()
+
+
+def test_post_edit_keeps_comment_count(
+        mixer, user_client, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    loaded = type(post).objects.get(pk=post.pk)
+    mixer.cycle(2).blend('blog.Comment', post=post)
+
+    loaded.title = 'Заголовок после правки'
+    loaded.save()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что сохранение публикации не затирает счётчик'
+        ' комментариев устаревшим значением.'
+    )
+    assert post.title == 'Заголовок после правки'
+
+    response = user_client.post(f'/posts/{post.id}/edit/', {
+        'title': 'Правка через форму', 'text': post.text,
+        'pub_date': '2020-01-01T10:00', 'category': published_category.pk,
+        'is_published': True,
+    })
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.title == 'Правка через форму'
+    assert post.comment_count == 2
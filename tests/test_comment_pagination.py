@@ -0,0 +1,51 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(5).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+def test_detail_shows_first_comment_page(
+        user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    comments = user_client.get(f'/posts/{post.id}/').context['comments']
+    assert [c.id for c in comments] == [c.id for c in many_comments[:2]], (
+        'Убедитесь, что на странице поста показывается только первая'
+        ' страница комментариев, от старых к новым.'
+    )
+    assert comments.has_next()
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+def test_comment_pages_endpoint(
+        client, post_with_published_location, many_comments
+):
+    url = f'/posts/{post_with_published_location.id}/comments/'
+    seen, cursor = [], ''
+    while True:
+        data = client.get(url, {'format': 'json', 'cursor': cursor}).json()
+        seen.extend(comment['id'] for comment in data['comments'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+    assert seen == [comment.id for comment in many_comments]
+
+    fragment = client.get(url).content.decode('utf-8')
+    assert f'name="comment_{many_comments[0].id}"' in fragment
+    assert f'name="comment_{many_comments[2].id}"' not in fragment
+    assert 'data-fragment-url' in fragment
+
+
+def test_comment_pages_endpoint_hides_unpublished(
+        client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    assert client.get(f'/posts/{post.id}/comments/').status_code == 404
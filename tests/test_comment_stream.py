@@ -0,0 +1,200 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+
+from blog.models import Comment
+from blog.pubsub import Broker, serve_relay
+from blog.sse import CommentStreamRouter
+
+pytestmark = [pytest.mark.django_db]
+
+TIMEOUT = 5
+
+
+def stream_url(post):
+    return f'/posts/{post.id}/comments/stream/'
+
+
+class FakeASGIConnection:
+    """Клиент ASGI: копит отправленный ответ и умеет отключиться."""
+
+    def __init__(self):
+        self.messages = []
+        self.body = b''
+        self.changed = asyncio.Event()
+        self.closed = asyncio.Event()
+
+    async def receive(self):
+        await self.closed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.messages.append(message)
+        self.body += message.get('body', b'')
+        self.changed.set()
+
+    async def wait_for(self, text):
+        while text.encode() not in self.body:
+            self.changed.clear()
+            await asyncio.wait_for(self.changed.wait(), TIMEOUT)
+
+
+def make_scope(path, headers=()):
+    return {
+        'type': 'http', 'method': 'GET', 'path': path,
+        'query_string': b'', 'headers': list(headers),
+    }
+
+
+async def not_found_app(scope, receive, send):
+    raise AssertionError('Запрос не должен попасть в Django.')
+
+
+def test_stream_is_linked_from_post_page(
+        settings, client, post_with_published_location
+):
+    settings.COMMENT_STREAM = True
+    content = client.get(
+        f'/posts/{post_with_published_location.id}/'
+    ).content.decode('utf-8')
+    assert stream_url(post_with_published_location) in content, (
+        'Убедитесь, что страница публикации подключается к потоку'
+        ' комментариев.'
+    )
+
+
+def test_post_page_does_not_poll_without_stream(
+        settings, client, post_with_published_location
+):
+    settings.COMMENT_STREAM = False
+    content = client.get(
+        f'/posts/{post_with_published_location.id}/'
+    ).content.decode('utf-8')
+    assert stream_url(post_with_published_location) not in content, (
+        'Убедитесь, что без ASGI страница не опрашивает поток комментариев.'
+    )
+
+
+def test_wsgi_stream_returns_missed_comments(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    old, new = mixer.cycle(2).blend(
+        'blog.Comment', post=post, author=user, text=mixer.sequence(
+            'Прочитанный комментарий', 'Пропущенный комментарий'
+        )
+    )
+    response = client.get(stream_url(post), HTTP_LAST_EVENT_ID=str(old.id))
+    assert response['Content-Type'] == 'text/event-stream'
+    content = response.content.decode('utf-8')
+    assert content.startswith('retry: '), (
+        'Убедитесь, что без ASGI клиент переподключается через'
+        ' COMMENT_STREAM_POLL_INTERVAL.'
+    )
+    assert f'id: {new.id}\nevent: comment\n' in content
+    assert 'Пропущенный комментарий' in content
+    assert 'Прочитанный комментарий' not in content
+
+
+def test_stream_hides_unpublished_posts(
+        client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    assert client.get(stream_url(post)).status_code == 404
+
+
+def test_subscription_overflow_closes_it():
+    async def scenario():
+        broker = Broker()
+        with broker.subscribe('channel', maxsize=1) as subscription:
+            broker.publish('channel', 1)
+            broker.publish('channel', 2)
+            await asyncio.sleep(0)
+            return await subscription.get()
+
+    assert async_to_sync(scenario)() is None, (
+        'Убедитесь, что медленный подписчик отключается, а не копит'
+        ' сообщения без предела.'
+    )
+
+
+def test_relay_connects_brokers():
+    ready = threading.Event()
+    servers = []
+
+    def run_relay():
+        asyncio.run(serve_relay(
+            '127.0.0.1', 0,
+            lambda server: (servers.append(server), ready.set())
+        ))
+
+    threading.Thread(target=run_relay, daemon=True).start()
+    assert ready.wait(TIMEOUT)
+    port = servers[0].sockets[0].getsockname()[1]
+    publisher = Broker(f'127.0.0.1:{port}')
+    listener = Broker(f'127.0.0.1:{port}')
+    assert publisher.relay.connected.wait(TIMEOUT)
+    assert listener.relay.connected.wait(TIMEOUT)
+
+    async def scenario():
+        with listener.subscribe('channel') as subscription:
+            # Ретранслятор мог ещё не зарегистрировать соединение
+            # слушателя: доставка не гарантируется, публикуем повторно.
+            for _ in range(TIMEOUT * 10):
+                publisher.publish('channel', {'id': 1})
+                try:
+                    return await asyncio.wait_for(subscription.get(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
+
+    assert async_to_sync(scenario)() == {'id': 1}, (
+        'Убедитесь, что ретранслятор доставляет сообщения другим процессам.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_stream_pushes_new_comments(user, post_with_published_location):
+    post = post_with_published_location
+
+    async def scenario():
+        connection = FakeASGIConnection()
+        stream = asyncio.ensure_future(
+            CommentStreamRouter(not_found_app)(
+                make_scope(stream_url(post)),
+                connection.receive, connection.send
+            )
+        )
+        await connection.wait_for('retry: ')
+        await sync_to_async(Comment.objects.create)(
+            post=post, author=user, text='Свежий комментарий'
+        )
+        await connection.wait_for('Свежий комментарий')
+        connection.closed.set()
+        await asyncio.wait_for(stream, TIMEOUT)
+        return connection
+
+    connection = async_to_sync(scenario)()
+    start = connection.messages[0]
+    assert start['status'] == 200
+    assert (b'content-type', b'text/event-stream') in start['headers']
+    assert 'event: comment' in connection.body.decode('utf-8'), (
+        'Убедитесь, что новый комментарий приходит в открытый поток.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_stream_checks_visibility(
+        unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+
+    async def scenario():
+        connection = FakeASGIConnection()
+        await asyncio.wait_for(CommentStreamRouter(not_found_app)(
+            make_scope(stream_url(post)), connection.receive, connection.send
+        ), TIMEOUT)
+        return connection
+
+    assert async_to_sync(scenario)().messages[0]['status'] == 404
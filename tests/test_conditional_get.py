@@ -0,0 +1,157 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.cache import bump_content_generation
+from blog.querybudget import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_pages_send_validators(client, post_with_published_location):
+    post = post_with_published_location
+    urls = (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    )
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Убедитесь, что страница `{url}` отдаёт заголовок ETag.'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Убедитесь, что страница `{url}` отдаёт заголовок Last-Modified.'
+        )
+
+
+def test_if_none_match_returns_304(
+        client, post_with_published_location, django_assert_num_queries
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что при совпадении ETag страница публикации отвечает'
+        ' 304 Not Modified без запросов к базе.'
+    )
+    assert not response.content
+
+
+def test_if_modified_since_returns_304(client, post_with_published_location):
+    response = client.get('/')
+    response = client.get(
+        '/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == 304, (
+        'Убедитесь, что лента отвечает 304 Not Modified, если с даты'
+        ' If-Modified-Since публикации не менялись.'
+    )
+
+
+def test_validators_change_after_edit(client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    first = client.get(url)
+    post.title = 'Заголовок после правки'
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 200, (
+        'Убедитесь, что после правки публикации старый ETag не даёт 304.'
+    )
+    assert response['ETag'] != first['ETag']
+    assert post.title in response.content.decode('utf-8')
+
+
+def test_new_comment_changes_last_modified(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    long_ago = timezone.now() - timedelta(days=30)
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=long_ago, updated_at=long_ago
+    )
+    # update() не шлёт сигналов: сбрасываем поколение контента вручную.
+    bump_content_generation()
+    last_modified = client.get(url)['Last-Modified']
+    assert last_modified == http_date(int(long_ago.timestamp()))
+    mixer.blend('blog.Comment', post=post, author=post.author)
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        'Убедитесь, что новый комментарий обновляет Last-Modified'
+        ' страницы публикации.'
+    )
+    assert response['Last-Modified'] != last_modified
+
+
+def test_feed_last_modified_skips_updated_at_scan(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    long_ago = timezone.now() - timedelta(days=30)
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=long_ago, updated_at=long_ago
+    )
+    bump_content_generation()
+    with record_queries() as report:
+        response = client.get('/')
+    assert not any('MAX(' in sql.upper() for sql, _ in report.queries), (
+        'Убедитесь, что Last-Modified ленты не считает MAX(updated_at)'
+        ' по всем публикациям.'
+    )
+    stale = http_date(int(long_ago.timestamp()))
+    assert response['Last-Modified'] != stale, (
+        'Убедитесь, что Last-Modified ленты учитывает время смены'
+        ' поколения контента.'
+    )
+    response = client.get(
+        '/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == 304
+
+
+@pytest.fixture
+def move_clock(monkeypatch):
+    def move(delta):
+        now = timezone.now() + delta
+        moved_time = time.time() + delta.total_seconds()
+        monkeypatch.setattr(timezone, 'now', lambda: now)
+        # Сроки записей кэша считаются по time.time().
+        monkeypatch.setattr(time, 'time', lambda: moved_time)
+    return move
+
+
+def test_scheduled_post_changes_etag(
+        settings, user_client, mixer, user, published_category, move_clock
+):
+    settings.PUBLICATION_SCHEDULER = False
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    scheduled = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=10)
+    )
+    urls = (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        '/feed/rss/',
+    )
+    etags = {url: user_client.get(url)['ETag'] for url in urls}
+    move_clock(timedelta(minutes=11))
+    for url, etag in etags.items():
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что `{url}` не отвечает 304 по старому ETag, когда'
+            ' наступила дата отложенной публикации.'
+        )
+    assert scheduled.title in user_client.get('/').content.decode('utf-8')
@@ -0,0 +1,73 @@
+import base64
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    first = user_client.get('/').context['page_obj']
+    assert len(first) == N_PER_PAGE
+    assert first.has_next() and not first.has_previous(), (
+        'Убедитесь, что первая страница курсорной пагинации ссылается только'
+        ' на следующую страницу.'
+    )
+
+    second = user_client.get(
+        '/', {'cursor': first.next_cursor}
+    ).context['page_obj']
+    seen = [post.id for post in first] + [post.id for post in second]
+    expected = sorted(
+        posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert seen == [post.id for post in expected], (
+        'Убедитесь, что курсорная пагинация выдаёт публикации по порядку'
+        ' без пропусков и повторов.'
+    )
+    assert not second.has_next() and second.has_previous()
+
+    back = user_client.get(
+        '/', {'cursor': second.previous_cursor}
+    ).context['page_obj']
+    assert [post.id for post in back] == [post.id for post in first]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination_rejects_broken_cursor(user_client):
+    response = user_client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
+
+
+def make_cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+OUT_OF_RANGE_CURSORS = [
+    make_cursor('["2020-01-01T00:00:00+00:00",1e999]'),
+    make_cursor(f'["2020-01-01T00:00:00+00:00",{10 ** 27}]'),
+    make_cursor(f'["2020-01-01T00:00:00+00:00",{-10 ** 27}]'),
+]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+@pytest.mark.parametrize('cursor', OUT_OF_RANGE_CURSORS)
+def test_cursor_pagination_rejects_out_of_range_pk(
+        user_client, post_with_published_location, cursor
+):
+    urls = (
+        '/',
+        f'/posts/{post_with_published_location.id}/comments/',
+        '/api/posts/',
+    )
+    for url in urls:
+        assert user_client.get(url, {'cursor': cursor}).status_code == 404, (
+            f'Убедитесь, что {url} отвечает 404 на курсор с id вне'
+            ' диапазона BIGINT.'
+        )
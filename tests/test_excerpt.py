@@ -0,0 +1,41 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_is_computed_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = ' '.join(f'слово{i}' for i in range(30))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == ' '.join(f'слово{i}' for i in range(10)) + ' …'
+
+
+def test_feed_does_not_load_text(user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        content = user_client.get('/').content.decode('utf-8')
+    feed_queries = [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT "blog_post"."id"')
+    ]
+    assert feed_queries
+    assert all('"blog_post"."text"' not in sql for sql in feed_queries), (
+        'Убедитесь, что лента не загружает полный текст публикаций.'
+    )
+    assert post_with_published_location.excerpt in content
+
+
+def test_backfill_excerpts(mixer, post_with_published_location):
+    Post.objects.update(excerpt='')
+    out = StringIO()
+    call_command('backfill_excerpts', batch_size=1, stdout=out)
+    post = Post.objects.get()
+    assert post.excerpt
+    assert 'Обновлено анонсов: 1' in out.getvalue()
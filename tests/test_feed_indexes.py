@@ -0,0 +1,22 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_queries_use_indexes(post_with_published_location):
+    out = StringIO()
+    call_command('explain_feed', repeat=1, stdout=out)
+    with_indexes, without_indexes = out.getvalue().split('Без индексов')
+    for index in (
+        'post_published_feed_idx',
+        'post_category_pub_date_idx',
+        'post_author_pub_date_idx',
+        'comment_post_created_idx',
+    ):
+        assert index in with_indexes, (
+            f'Убедитесь, что запросы ленты используют индекс `{index}`.'
+        )
+        assert index not in without_indexes
@@ -0,0 +1,122 @@
+from xml.etree import ElementTree
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.feeds import LatestPostsFeed, RssFeed
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+def read_feed(response):
+    assert response.streaming, 'Убедитесь, что лента отдаётся потоком.'
+    return ElementTree.fromstring(b''.join(response.streaming_content))
+
+
+def test_atom_feed_lists_published_posts(
+        client, many_posts_with_published_locations,
+        unpublished_posts_with_published_locations
+):
+    response = client.get('/feed/atom/')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('application/atom+xml')
+    entries = read_feed(response).findall(f'{ATOM}entry')
+    assert 0 < len(entries) <= 20
+    titles = {entry.findtext(f'{ATOM}title') for entry in entries}
+    hidden = {
+        post.title for post in unpublished_posts_with_published_locations
+    }
+    assert not titles & hidden, (
+        'Убедитесь, что в ленту не попадают неопубликованные публикации.'
+    )
+
+
+def test_rss_feeds_for_category_and_author(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (
+        '/feed/rss/',
+        f'/category/{post.category.slug}/feed/rss/',
+        f'/profile/{post.author.username}/feed/rss/',
+    ):
+        response = client.get(url)
+        assert response.status_code == 200, url
+        items = read_feed(response).findall('channel/item')
+        assert [item.findtext('title') for item in items] == [post.title], (
+            f'Убедитесь, что лента `{url}` содержит публикацию.'
+        )
+        assert items[0].findtext('description') == post.text
+
+
+def test_unknown_feed_returns_404(client, post_with_published_location):
+    assert client.get('/feed/json/').status_code == 404
+    assert client.get('/category/no-such-slug/feed/rss/').status_code == 404
+    assert client.get('/profile/nobody/feed/rss/').status_code == 404
+
+
+def test_feed_entries_are_cached(
+        client, many_posts_with_published_locations
+):
+    first = b''.join(client.get('/feed/atom/').streaming_content)
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get('/feed/atom/')
+        second = b''.join(second.streaming_content)
+    assert not any('"text"' in query['sql'] for query in queries), (
+        'Убедитесь, что записи ленты берутся из кэша без загрузки текста.'
+    )
+    assert first.split(b'<entry>', 1)[1] == second.split(b'<entry>', 1)[1]
+
+
+def test_feed_entry_is_invalidated(client, post_with_published_location):
+    post = post_with_published_location
+    b''.join(client.get('/feed/rss/').streaming_content)
+    post.title = 'Заголовок после правки'
+    post.save()
+    content = b''.join(client.get('/feed/rss/').streaming_content)
+    assert post.title in content.decode('utf-8'), (
+        'Убедитесь, что запись ленты обновляется после правки публикации.'
+    )
+
+
+def test_feed_conditional_get(
+        client, post_with_published_location, django_assert_num_queries
+):
+    response = client.get('/feed/atom/')
+    with django_assert_num_queries(0):
+        response = client.get(
+            '/feed/atom/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert response.status_code == 304, (
+        'Убедитесь, что лента отвечает 304 Not Modified без запросов к базе.'
+    )
+
+
+def test_feed_serializes_post_deleted_meanwhile(
+        rf, post_with_published_location
+):
+    post = post_with_published_location
+    pk = post.pk
+    post.delete()
+    post.pk = pk
+    view = LatestPostsFeed(request=rf.get('/feed/rss/'))
+    feed = RssFeed(title='Блогикум', link='http://testserver/',
+                   description='')
+    [item] = view.serialize_posts(feed, [post])
+    assert post.title in item, (
+        'Убедитесь, что удалённая между запросами публикация не роняет'
+        ' ленту.'
+    )
+
+
+def test_feed_entries_depend_on_scheme(client, post_with_published_location):
+    client.get('/feed/rss/')
+    content = b''.join(
+        client.get('/feed/rss/', secure=True).streaming_content
+    ).decode('utf-8')
+    assert f'https://testserver/posts/{post_with_published_location.id}/' in (
+        content
+    ), 'Убедитесь, что записи ленты кэшируются отдельно для http и https.'
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+def test_loaddata_db_json():
+    call_command('loaddata', DB_JSON, verbosity=0)
+    assert Post.objects.exists()
+    assert not Post.objects.filter(updated_at__isnull=True).exists(), (
+        'Убедитесь, что публикации из фикстуры получают время изменения.'
+    )
+    assert not Post.objects.filter(excerpt='').exists(), (
+        'Убедитесь, что публикации из фикстуры получают анонс.'
+    )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import get_page_cache_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feed_is_cached(
+        client, post_with_published_location, django_assert_num_queries
+):
+    first = client.get('/')
+    with django_assert_num_queries(0):
+        second = client.get('/')
+    assert second.content == first.content, (
+        'Убедитесь, что повторный запрос ленты анонимом отдаётся из кэша.'
+    )
+
+
+def test_page_cache_varies_on_page(
+        client, many_posts_with_published_locations
+):
+    assert client.get('/').content != client.get('/?page=2').content
+
+
+def test_page_cache_is_invalidated(client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    client.get(f'/posts/{post.id}/')
+    post.title = 'Заголовок после правки'
+    post.save()
+    for url in ('/', f'/posts/{post.id}/'):
+        assert post.title in client.get(url).content.decode('utf-8'), (
+            'Убедитесь, что кэш страниц сбрасывается после изменения'
+            ' публикации.'
+        )
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get('/')
+    assert len(queries) > 0, (
+        'Убедитесь, что страницы авторизованных пользователей не кэшируются.'
+    )
+
+
+def test_page_cache_expires_before_scheduled_post(
+        settings, mixer, user, published_category
+):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30)
+    )
+    assert 0 < get_page_cache_timeout() <= 30 < settings.PAGE_CACHE_TIMEOUT
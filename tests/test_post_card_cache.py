@@ -0,0 +1,52 @@
+import pytest
+
+from blog import cache as post_card_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def render_counter(monkeypatch):
+    calls = []
+    original = post_card_cache.render_to_string
+
+    def counting_render(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(post_card_cache, 'render_to_string', counting_render)
+    return calls
+
+
+def test_cards_are_served_from_cache(
+        user_client, many_posts_with_published_locations, render_counter
+):
+    user_client.get('/')
+    rendered_first = len(render_counter)
+    assert rendered_first > 0
+    user_client.get('/')
+    assert len(render_counter) == rendered_first, (
+        'Убедитесь, что повторный показ ленты берёт карточки из кэша.'
+    )
+
+
+def test_cards_are_invalidated_on_change(
+        user_client, post_with_published_location, mixer
+):
+    post = post_with_published_location
+    user_client.get('/')
+
+    post.title = 'Заголовок после правки'
+    post.save()
+    assert post.title in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что карточка обновляется после изменения публикации.'
+    )
+
+    mixer.blend('blog.Comment', post=post)
+    assert '(1)' in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что карточка обновляется после добавления комментария.'
+    )
+
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert 'Новая категория' in user_client.get('/').content.decode('utf-8')
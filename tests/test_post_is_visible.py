@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_is_visible_follows_post_and_category(post_with_published_location):
+    post = post_with_published_location
+    assert post.is_visible
+
+    post.is_published = False
+    post.save()
+    assert not Post.objects.get(pk=post.pk).is_visible
+
+    post.is_published = True
+    post.save()
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert not Post.objects.get(pk=post.pk).is_visible, (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+
+    category.is_published = True
+    category.save()
+    assert Post.objects.get(pk=post.pk).is_visible
+
+
+def test_feed_filter_does_not_join_category(post_with_published_location):
+    sql = str(Post.objects.published().query)
+    assert 'blog_category' not in sql, (
+        'Убедитесь, что фильтр ленты не соединяет таблицу категорий.'
+    )
+
+
+def test_check_visibility_fixes_drift(post_with_published_location):
+    Post.objects.update(is_visible=False)
+    out = StringIO()
+    call_command('check_visibility', fix=True, stdout=out)
+    assert 'Скрыты по ошибке: 1' in out.getvalue()
+    assert Post.objects.get().is_visible
@@ -0,0 +1,50 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_visible_to(
+        user, another_user, unpublished_posts_with_published_locations,
+        post_of_another_author
+):
+    hidden = unpublished_posts_with_published_locations
+    assert set(Post.objects.visible_to(user)) == {
+        *hidden, post_of_another_author
+    }, 'Убедитесь, что автор видит свои снятые с публикации посты.'
+    assert list(Post.objects.visible_to(another_user)) == [
+        post_of_another_author
+    ]
+    assert list(Post.objects.visible_to(AnonymousUser())) == [
+        post_of_another_author
+    ]
+
+
+def test_detail_fetches_post_once(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as queries:
+        response = another_user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+    post_queries = [
+        query for query in queries
+        if query['sql'].startswith('SELECT "blog_post"."id"')
+    ]
+    assert len(post_queries) == 1, (
+        'Убедитесь, что страница публикации загружает пост одним запросом.'
+    )
+
+
+def test_cannot_comment_hidden_post(
+        another_user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+    )
+    assert response.status_code == 404
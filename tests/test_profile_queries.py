@@ -0,0 +1,25 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_profile_queries(
+        client, user, many_posts_with_published_locations
+):
+    url = f'/profile/{user.username}/'
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {'page': 2})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == 10
+    sqls = [query['sql'] for query in queries]
+    assert sum('FROM "auth_user"' in sql
+               and 'FROM "blog_post"' not in sql for sql in sqls) == 1, (
+        'Убедитесь, что страница профиля загружает пользователя один раз.'
+    )
+    assert not any('COUNT(' in sql for sql in sqls), (
+        'Убедитесь, что число публикаций автора берётся из кэша.'
+    )
+    assert sum('FROM "blog_post"' in sql for sql in sqls) == 1
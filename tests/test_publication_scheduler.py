@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.cache import get_content_generation
+from blog.scheduler import PublicationScheduler
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduler_bumps_generation_when_post_goes_live(
+        mixer, user, published_category
+):
+    now = timezone.now()
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=now + timedelta(minutes=5)
+    )
+    scheduler = PublicationScheduler(interval=600)
+
+    assert scheduler.tick(now) == pytest.approx(300, abs=1), (
+        'Убедитесь, что планировщик просыпается к ближайшей публикации.'
+    )
+    generation = get_content_generation()
+    scheduler.tick(now + timedelta(minutes=1))
+    assert get_content_generation() == generation
+
+    assert scheduler.tick(now + timedelta(minutes=6)) == 600
+    assert get_content_generation() != generation, (
+        'Убедитесь, что с наступлением pub_date поколение контента меняется.'
+    )
@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+
+from blog.models import Post
+from blog.querybudget import get_query_shape, record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_posts(mixer, user, many_posts_with_published_locations):
+    for post in many_posts_with_published_locations[:10]:
+        mixer.blend('blog.Comment', post=post, author=user)
+    return many_posts_with_published_locations
+
+
+@pytest.mark.parametrize('client_fixture', ['client', 'user_client'])
+def test_pages_fit_query_budgets(
+        request, client_fixture, commented_posts, query_budget
+):
+    client = request.getfixturevalue(client_fixture)
+    post = commented_posts[0]
+    pages = {
+        'blog:index': '/',
+        'blog:post_detail': f'/posts/{post.id}/',
+        'blog:category_posts': f'/category/{post.category.slug}/',
+        'blog:profile': f'/profile/{post.author.username}/',
+        'blog:search': '/search/?q=post',
+    }
+    for view, url in pages.items():
+        with query_budget(view=view):
+            assert client.get(url).status_code == 200
+
+
+def test_n_plus_one_is_detected(commented_posts, query_budget):
+    with pytest.raises(AssertionError, match='N\\+1'):
+        with query_budget():
+            for post in Post.objects.all()[:10]:
+                post.location.is_published
+
+
+def test_in_lists_share_a_shape():
+    assert get_query_shape('SELECT 1 WHERE id IN (%s, %s)') == (
+        get_query_shape('SELECT 1 WHERE id IN (%s)')
+    )
+
+
+def test_middleware_warns_over_budget(
+        settings, client, commented_posts, caplog
+):
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGETS = {'blog:index': 1}
+    with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+        response = client.get('/')
+    assert int(response['X-DB-Queries']) > 1
+    assert any(
+        'blog:index' in record.getMessage() for record in caplog.records
+    ), 'Убедитесь, что превышение бюджета запросов пишется в лог.'
+
+
+def test_record_queries_measures_time(commented_posts):
+    with record_queries('test') as report:
+        list(Post.objects.all())
+    assert report.count == 1
+    assert report.duration > 0
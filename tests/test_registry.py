@@ -0,0 +1,87 @@
+import pytest
+
+from blog import registry
+from blog.forms import PostCreateForm
+from blog.models import Category
+from blog.querybudget import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+REGISTRY_TABLES = ('FROM "blog_category"', 'FROM "blog_location"')
+
+
+def registry_queries(report):
+    return [
+        sql for sql, _ in report.queries
+        if any(table in sql for table in REGISTRY_TABLES)
+    ]
+
+
+def test_category_page_reads_category_from_registry(
+        another_user_client, post_with_published_location
+):
+    url = f'/category/{post_with_published_location.category.slug}/'
+    another_user_client.get(url)
+    with record_queries() as report:
+        assert another_user_client.get(url).status_code == 200
+    assert not registry_queries(report), (
+        'Убедитесь, что страница категории берёт категорию из реестра,'
+        ' а не из базы.'
+    )
+
+
+def test_post_form_renders_choices_without_queries(
+        published_category, published_location
+):
+    PostCreateForm().as_p()
+    with record_queries() as report:
+        html = PostCreateForm().as_p()
+    assert report.count == 0, (
+        'Убедитесь, что форма публикации берёт категории и местоположения'
+        ' из реестра.'
+    )
+    assert published_category.title in html
+    assert published_location.name in html
+
+
+def test_post_form_validates_against_registry(published_category):
+    data = {
+        'title': 'Заголовок', 'text': 'Текст',
+        'pub_date': '2020-01-01T10:00', 'is_published': True,
+    }
+    form = PostCreateForm(data={**data, 'category': published_category.pk})
+    assert form.is_valid(), form.errors
+    assert form.cleaned_data['category'] == published_category
+    form = PostCreateForm(data={**data, 'category': 0})
+    assert 'category' in form.errors
+
+
+def test_category_changes_invalidate_registry(client, published_category):
+    url = f'/category/{published_category.slug}/'
+    client.get(url)
+    published_category.title = 'Новое название'
+    published_category.save()
+    assert 'Новое название' in client.get(url).content.decode('utf-8')
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == 404, (
+        'Убедитесь, что снятая с публикации категория пропадает из реестра.'
+    )
+
+
+def test_registry_reloads_on_generation_change(published_category):
+    assert registry.get_category(published_category.pk).title == (
+        published_category.title
+    )
+    # Изменение в другом процессе: сигналов здесь нет, но поколение
+    # в общем кэше сдвинуто.
+    Category.objects.filter(pk=published_category.pk).update(
+        title='Из другого процесса'
+    )
+    assert registry.get_category(published_category.pk).title == (
+        published_category.title
+    )
+    registry.bump_registry_generation()
+    assert registry.get_category(published_category.pk).title == (
+        'Из другого процесса'
+    ), 'Убедитесь, что реестр перечитывается при смене поколения.'
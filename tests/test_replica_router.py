@@ -0,0 +1,108 @@
+import sqlite3
+
+import pytest
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.cache import bump_content_generation, get_page_cache_timeout
+from blog.models import Post
+from blog.routers import use_primary
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Отдельный файл SQLite вместо реплики.
+
+    Возвращает функцию, которая «реплицирует» основную базу: копирует
+    её в файл реплики целиком.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    connections.databases['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path),
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+
+    def replicate():
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        primary.connection.backup(target)
+        target.close()
+
+    replicate()
+    yield replicate
+    connections['replica'].close()
+    delattr(connections._connections, 'replica')
+    del connections.databases['replica']
+
+
+def test_router_sends_reads_to_replica(replica):
+    assert Post.objects.all().db == 'replica', (
+        'Убедитесь, что чтение направляется в реплику.'
+    )
+    with use_primary():
+        assert Post.objects.all().db == DEFAULT_DB_ALIAS
+    with transaction.atomic():
+        assert Post.objects.all().db == DEFAULT_DB_ALIAS, (
+            'Убедитесь, что чтение внутри транзакции идёт в основную базу.'
+        )
+
+
+def test_feed_reads_from_replica(
+        user_client, replica, post_with_published_location
+):
+    # Авторизованный клиент: его страницы не попадают в кэш страниц.
+    post = post_with_published_location
+    assert post.title not in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что лента читается из реплики.'
+    )
+    replica()
+    # Данные из реплики кэшируются не дольше REPLICA_LAG_SECONDS;
+    # очистка кэша заменяет ожидание.
+    for cache in caches.all():
+        cache.clear()
+    assert post.title in user_client.get('/').content.decode('utf-8')
+
+
+def test_replica_reads_are_cached_briefly_after_change(settings, replica):
+    settings.PAGE_CACHE_TIMEOUT = 300
+    settings.REPLICA_LAG_SECONDS = 10
+    bump_content_generation()
+    assert get_page_cache_timeout() == 10, (
+        'Убедитесь, что сразу после изменения данные из реплики кэшируются'
+        ' не дольше REPLICA_LAG_SECONDS.'
+    )
+    with use_primary():
+        assert get_page_cache_timeout() == 300
+
+
+def test_reads_stick_to_primary_after_write(
+        user_client, client, replica, post_with_published_location
+):
+    post = post_with_published_location
+    replica()
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Свежий комментарий'}
+    )
+    assert response.status_code == 302
+    cookie = response.cookies.get('use_primary')
+    assert cookie is not None and cookie['max-age'] == 10, (
+        'Убедитесь, что после записи клиент получает cookie, привязывающую'
+        ' его чтения к основной базе.'
+    )
+
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'Свежий комментарий' in content, (
+        'Убедитесь, что сразу после записи клиент читает из основной базы.'
+    )
+
+    del user_client.cookies['use_primary']
+    content = user_client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'Свежий комментарий' not in content
+
+
+def test_no_replicas_means_primary(settings):
+    settings.DATABASE_REPLICAS = []
+    assert Post.objects.all().db == DEFAULT_DB_ALIAS
@@ -0,0 +1,116 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.search import build_match_query
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search_titles(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return [post.title for post in response.context['page_obj']]
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    def make(title, text='', **kwargs):
+        kwargs.setdefault('category', published_category)
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            'blog.Post', author=user, title=title, text=text, **kwargs
+        )
+    return make
+
+
+def test_search_by_title_text_and_comment(
+        client, mixer, user, search_posts
+):
+    by_title = search_posts('Северное сияние')
+    by_text = search_posts('Заметка', 'Видели сияние над озером')
+    commented = search_posts('Прогулка', 'Без происшествий')
+    mixer.blend('blog.Comment', post=commented, author=user,
+                text='А мы видели сияние!')
+    search_posts('Другое', 'Совсем о другом')
+
+    titles = search_titles(client, 'сияние')
+    assert set(titles) == {by_title.title, by_text.title, commented.title}, (
+        'Убедитесь, что поиск находит публикации по заголовку, тексту и'
+        ' комментариям.'
+    )
+    assert titles[0] == by_title.title, (
+        'Убедитесь, что совпадение в заголовке ранжируется выше.'
+    )
+
+
+def test_search_matches_word_prefix(client, search_posts):
+    post = search_posts('Публикации недели')
+    assert search_titles(client, 'публикац') == [post.title]
+
+
+def test_search_respects_visibility(
+        client, search_posts, posts_with_unpublished_category, future_posts
+):
+    visible = search_posts('Лес видимый')
+    search_posts('Лес черновик', is_published=False)
+    for post in (*posts_with_unpublished_category, *future_posts):
+        post.title = 'Лес скрытый'
+        post.save()
+    assert search_titles(client, 'лес') == [visible.title], (
+        'Убедитесь, что поиск учитывает те же правила видимости, что и'
+        ' лента.'
+    )
+
+
+def test_search_index_follows_edits_and_deletes(client, search_posts):
+    post = search_posts('Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert search_titles(client, 'старый') == []
+    assert search_titles(client, 'новый') == [post.title]
+    post.delete()
+    assert search_titles(client, 'новый') == []
+
+
+def test_search_is_paginated(client, search_posts):
+    for number in range(12):
+        search_posts(f'Поход {number}')
+    first = search_titles(client, 'поход')
+    second = search_titles(client, 'поход', page=2)
+    assert len(first) == 10 and len(second) == 2
+    assert not set(first) & set(second)
+    response = client.get('/search/', {'q': 'поход'})
+    assert 'q=%D0%BF%D0%BE%D1%85%D0%BE%D0%B4&amp;page=2' in (
+        response.content.decode('utf-8')
+    ), 'Убедитесь, что ссылки пагинации сохраняют поисковый запрос.'
+
+
+def test_query_syntax_is_escaped(client, search_posts):
+    assert build_match_query('"NEAR( OR -') == '"near"* "or"*'
+    assert search_titles(client, '"))') == []
+    assert search_titles(client, '') == []
+
+
+def test_rebuild_search_index(client, mixer, user, search_posts):
+    post = search_posts('Осенний марафон')
+    mixer.blend('blog.Comment', post=post, author=user, text='Отличный бег')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_search')
+    assert search_titles(client, 'марафон') == []
+
+    call_command('rebuild_search_index', batch_size=1)
+
+    assert search_titles(client, 'марафон') == [post.title]
+    assert search_titles(client, 'бег') == [post.title]
+
+
+def test_search_results_show_page_numbers(client, search_posts):
+    for number in range(35):
+        search_posts(f'Рассвет {number}')
+    content = client.get(
+        '/search/', {'q': 'рассвет', 'page': 2}
+    ).content.decode('utf-8')
+    assert 'page=3">3</a>' in content, (
+        'Убедитесь, что у результатов поиска есть номера страниц.'
+    )
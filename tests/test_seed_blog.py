@@ -0,0 +1,130 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+
+from blog.models import Category, Comment, Location, Post
+from blog.search import search_available
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(**options):
+    options = {
+        'users': 10, 'categories': 3, 'locations': 4, 'posts': 60,
+        'comments': 200, 'batch_size': 25, **options,
+    }
+    call_command('seed_blog', stdout=StringIO(), **options)
+
+
+def test_seed_blog_creates_requested_rows():
+    seed()
+    assert get_user_model().objects.count() == 10
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    assert Post.objects.count() == 60
+    assert Comment.objects.count() == 200, (
+        'Убедитесь, что seed_blog создаёт заданное число комментариев.'
+    )
+    assert not Post.objects.annotate(
+        actual=Count('comments')
+    ).exclude(comment_count=F('actual')).exists(), (
+        'Убедитесь, что seed_blog заполняет comment_count верно.'
+    )
+    assert not Post.objects.exclude(
+        is_visible=F('is_published')
+    ).filter(category__is_published=True).exists()
+    assert not Post.objects.filter(
+        is_visible=True, category__is_published=False
+    ).exists()
+
+
+def test_seed_blog_is_repeatable():
+    seed(seed=7)
+    first = list(Post.objects.order_by('pk').values_list(
+        'title', 'comment_count'
+    ))
+    for model in (Comment, Post, Category, Location, get_user_model()):
+        model.objects.all().delete()
+    seed(seed=7)
+    second = list(Post.objects.order_by('pk').values_list(
+        'title', 'comment_count'
+    ))
+    assert first == second, (
+        'Убедитесь, что одинаковое зерно даёт одинаковые данные.'
+    )
+
+
+def test_seed_blog_adds_to_seeded_database():
+    seed()
+    seed(seed=1)
+    assert get_user_model().objects.count() == 20
+    assert Category.objects.count() == 6, (
+        'Убедитесь, что повторный запуск seed_blog дополняет базу.'
+    )
+    assert Post.objects.count() == 120
+
+
+def test_seed_blog_skews_popularity():
+    seed(posts=100, comments=1000, skew=1.5)
+    counts = sorted(
+        Post.objects.values_list('comment_count', flat=True), reverse=True
+    )
+    assert sum(counts[:10]) > sum(counts) / 2, (
+        'Убедитесь, что комментарии распределены по закону Ципфа.'
+    )
+
+
+@pytest.mark.skipif(not search_available(), reason='FTS5 недоступен')
+def test_seed_blog_fills_search_index():
+    seed()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM blog_search')
+        assert cursor.fetchone()[0] == 260, (
+            'Убедитесь, что seed_blog перестраивает поисковый индекс.'
+        )
+
+
+def test_seed_blog_requires_authors():
+    with pytest.raises(CommandError):
+        seed(users=0)
+
+
+def test_benchmark_urls_writes_report(tmp_path):
+    seed()
+    output = tmp_path / 'benchmark.json'
+    call_command(
+        'benchmark_urls', requests=2, output=str(output), stdout=StringIO()
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    results = {
+        (item['name'], item['client']): item for item in report['results']
+    }
+    index = results[('blog:index', 'anonymous')]
+    assert index['statuses'] == [200]
+    assert index['p50_ms'] <= index['p95_ms'] <= index['p99_ms'], (
+        'Убедитесь, что benchmark_urls сохраняет перцентили задержки.'
+    )
+    assert ('blog:post_detail', 'author') in results
+    assert report['posts'] == 60
+
+    out = StringIO()
+    call_command(
+        'benchmark_urls', requests=1, output=str(tmp_path / 'next.json'),
+        compare=str(output), stdout=out
+    )
+    assert 'p95' in out.getvalue(), (
+        'Убедитесь, что benchmark_urls --compare выводит изменение p95.'
+    )
+
+
+def test_benchmark_urls_requires_data(tmp_path):
+    with pytest.raises(CommandError):
+        call_command(
+            'benchmark_urls', output=str(tmp_path / 'out.json'),
+            stdout=StringIO()
+        )
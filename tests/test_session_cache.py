@@ -0,0 +1,76 @@
+import pytest
+from django.contrib.auth import BACKEND_SESSION_KEY, authenticate
+from django.test import override_settings
+from django.test.client import Client
+
+from blog.querybudget import record_queries
+
+pytestmark = [pytest.mark.django_db]
+
+DB_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+def count_repeat_queries(user, url):
+    client = Client()
+    client.force_login(user)
+    client.get(url)
+    with record_queries() as report:
+        assert client.get(url).status_code == 200
+    return report.count
+
+
+def test_cached_auth_saves_two_queries(user, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    with override_settings(**DB_AUTH):
+        baseline = count_repeat_queries(user, url)
+    assert count_repeat_queries(user, url) == baseline - 2, (
+        'Убедитесь, что сессия и пользователь читаются из кэша, а не из'
+        ' базы.'
+    )
+
+
+def test_password_change_ends_cached_sessions(user_client, user):
+    user_client.get('/')
+    user.set_password('new-password-42')
+    user.save()
+    response = user_client.get('/posts/create/')
+    assert response.status_code == 302, (
+        'Убедитесь, что после смены пароля пользователь из кэша не'
+        ' остаётся авторизованным.'
+    )
+
+
+def test_user_changes_are_visible(user_client, user):
+    user_client.get('/')
+    user.first_name = 'Обновлённое имя'
+    user.save()
+    response = user_client.get('/')
+    assert response.wsgi_request.user.first_name == 'Обновлённое имя', (
+        'Убедитесь, что сохранение пользователя сбрасывает его кэш.'
+    )
+
+
+def test_sessions_from_model_backend_move_to_cached_backend(user):
+    client = Client()
+    client.force_login(
+        user, backend='django.contrib.auth.backends.ModelBackend'
+    )
+    response = client.get('/posts/create/')
+    assert response.status_code == 200, (
+        'Убедитесь, что сессии, созданные до кэша пользователей, не'
+        ' сбрасываются.'
+    )
+    assert client.session[BACKEND_SESSION_KEY] == (
+        'blog.auth.CachedModelBackend'
+    )
+
+
+def test_failed_login_checks_one_backend(user):
+    with record_queries() as report:
+        assert authenticate(username=user.username, password='wrong') is None
+    assert report.count == 1, (
+        'Убедитесь, что неудачный вход проверяет пароль одним бэкендом.'
+    )
@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+
+from blog.db import apply_sqlite_pragmas
+
+pytestmark = [pytest.mark.django_db]
+
+
+def read_pragma(cursor, name):
+    return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def test_django_connection_is_configured(settings):
+    with connection.cursor() as cursor:
+        assert read_pragma(cursor, 'busy_timeout') == (
+            settings.SQLITE_PRAGMAS['busy_timeout']
+        ), 'Убедитесь, что соединение с SQLite получает busy_timeout.'
+        assert read_pragma(cursor, 'cache_size') == (
+            settings.SQLITE_PRAGMAS['cache_size']
+        )
+        assert read_pragma(cursor, 'synchronous') == 1, (
+            'Убедитесь, что включён режим synchronous=NORMAL.'
+        )
+
+
+def test_file_database_switches_to_wal(settings, tmp_path):
+    db = sqlite3.connect(tmp_path / 'blog.sqlite3')
+    apply_sqlite_pragmas(db, settings.SQLITE_PRAGMAS)
+    assert read_pragma(db, 'journal_mode') == 'wal', (
+        'Убедитесь, что база в файле переводится в режим WAL.'
+    )
+    db.close()
+
+
+def test_invalid_pragma_name_is_rejected():
+    db = sqlite3.connect(':memory:')
+    with pytest.raises(ImproperlyConfigured):
+        apply_sqlite_pragmas(db, {'cache_size = 1; DROP TABLE x; --': 1})
+
+
+def test_benchmark_command_reports_both_modes(capsys):
+    call_command(
+        'benchmark_sqlite', workers=2, duration=0.2, posts=50
+    )
+    output = capsys.readouterr().out
+    assert 'Без PRAGMA' in output and 'SQLITE_PRAGMAS' in output
@@ -0,0 +1,36 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from blog.thumbnails import rendition_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_rendition_created_on_upload(
+        user_client, post_with_published_location
+):
+    image = post_with_published_location.image
+    name = rendition_name(image.name, 'card')
+    assert image.storage.exists(name), (
+        'Убедитесь, что при загрузке изображения создаётся превью.'
+    )
+    with image.storage.open(name) as file, Image.open(file) as rendition:
+        assert max(rendition.size) <= 640
+
+    content = user_client.get('/').content.decode('utf-8')
+    assert image.storage.url(name) in content, (
+        'Убедитесь, что в карточке публикации показывается превью.'
+    )
+
+
+def test_backfill_command(post_with_published_location):
+    image = post_with_published_location.image
+    image.storage.delete(rendition_name(image.name, 'card'))
+
+    out = StringIO()
+    call_command('generate_renditions', workers=1, stdout=out)
+    assert image.storage.exists(rendition_name(image.name, 'card'))
+    assert 'Создано превью: 1' in out.getvalue()